@@ -0,0 +1,297 @@
+# ============================================================
+#           ATTRIBUTE-ACCESS PROFILER — WHICH LOOKUPS ARE HOT?
+# ============================================================
+#
+# Description:
+#   dunder_dict_attribute.py, hasattr_function.py and
+#   oop_basics_lesson3.py (getattr/setattr/delattr) show several ways an
+#   attribute can be found, and each costs something different:
+#     - instance dict   → obj.__dict__[name]
+#     - slot            → a member descriptor created by __slots__
+#     - descriptor      → property, @lazy (while computing), custom
+#     - method          → a function on the class (non-data descriptor)
+#     - class attribute → plain value found on the class
+#     - __getattr__     → normal lookup failed, fallback ran
+#
+#   AttributeProfiler is opt-in instrumentation. Inside
+#   `with profiler.instrument(SomeClass, ...)` it wraps the classes'
+#   __getattribute__, __setattr__, __delattr__ and __getattr__, and
+#   records per (class, attribute): reads, writes (deletes count as
+#   writes), the lookup path and the time spent. On exit the classes
+#   are restored exactly.
+#
+#   report() lists the hottest attributes with a suggestion:
+#   __slots__ for hot dict attributes, caching (@lazy from
+#   lazy_attributes.py) for hot properties and __getattr__ fallbacks.
+#
+#   Dunder names (__dict__, __class__, ...) are not recorded. Times are
+#   inclusive (a property's time contains the lookups it makes) and
+#   include the profiler's own overhead — compare them with each other,
+#   not with uninstrumented code.
+#
+# Contents:
+#   1. Classifying the lookup path
+#   2. AttributeProfiler
+#   3. Report
+#   4. Demo with the lessons' classes
+#
+# ============================================================
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+# ============================================================
+# 1. CLASSIFYING THE LOOKUP PATH
+# ============================================================
+#
+# Mirrors object.__getattribute__: data descriptors on the type win,
+# then the instance __dict__, then anything else found on the type.
+
+def _find_on_type(cls, name):
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+    return None
+
+
+_MEMBER_DESCRIPTOR = type(type("_S", (), {"__slots__": ("x",)}).x)
+
+
+def lookup_path(obj, name):
+    cls = type(obj)
+    attr = _find_on_type(cls, name)
+    if attr is not None:
+        kind = type(attr)
+        if hasattr(kind, "__set__") or hasattr(kind, "__delete__"):
+            return "slot" if kind is _MEMBER_DESCRIPTOR else "descriptor"
+    try:
+        if name in object.__getattribute__(obj, "__dict__"):
+            return "instance dict"
+    except AttributeError:
+        pass                                     # no __dict__ (slots only)
+    if attr is None:
+        return "missing"
+    if callable(attr) and hasattr(type(attr), "__get__"):
+        return "method"
+    if hasattr(type(attr), "__get__"):
+        return "descriptor"
+    return "class attribute"
+
+
+# ============================================================
+# 2. ATTRIBUTEPROFILER
+# ============================================================
+
+class AttributeStats:
+    __slots__ = ("reads", "writes", "read_ns", "write_ns", "paths")
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.read_ns = 0
+        self.write_ns = 0
+        self.paths = Counter()
+
+    @property
+    def total_ns(self):
+        return self.read_ns + self.write_ns
+
+    def main_path(self):
+        return self.paths.most_common(1)[0][0] if self.paths else "-"
+
+
+class AttributeProfiler:
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.stats = {}                 # (class name, attribute) -> AttributeStats
+
+    def _entry(self, cls, name):
+        key = (cls.__qualname__, name)
+        entry = self.stats.get(key)
+        if entry is None:
+            entry = self.stats[key] = AttributeStats()
+        return entry
+
+    # -------- wrappers --------
+
+    def _wrap(self, cls):
+        profiler, clock = self, self.clock
+        original_get = cls.__getattribute__
+        original_set = cls.__setattr__
+        original_del = cls.__delattr__
+        original_getattr = getattr(cls, "__getattr__", None)
+
+        def __getattribute__(obj, name):
+            if name[:2] == "__":
+                return original_get(obj, name)
+            start = clock()
+            try:
+                value = original_get(obj, name)
+            except AttributeError:
+                entry = profiler._entry(type(obj), name)
+                entry.reads += 1
+                entry.read_ns += clock() - start
+                entry.paths["__getattr__" if original_getattr else "missing"] += 1
+                raise
+            elapsed = clock() - start
+            entry = profiler._entry(type(obj), name)
+            entry.reads += 1
+            entry.read_ns += elapsed
+            entry.paths[lookup_path(obj, name)] += 1
+            return value
+
+        def __setattr__(obj, name, value):
+            start = clock()
+            original_set(obj, name, value)
+            elapsed = clock() - start
+            entry = profiler._entry(type(obj), name)
+            entry.writes += 1
+            entry.write_ns += elapsed
+
+        def __delattr__(obj, name):
+            start = clock()
+            original_del(obj, name)
+            elapsed = clock() - start
+            entry = profiler._entry(type(obj), name)
+            entry.writes += 1
+            entry.write_ns += elapsed
+
+        patched = {"__getattribute__": __getattribute__, "__setattr__": __setattr__,
+                   "__delattr__": __delattr__}
+
+        if original_getattr is not None:
+            def __getattr__(obj, name):
+                start = clock()
+                try:
+                    return original_getattr(obj, name)
+                finally:
+                    # The failed normal lookup was already counted as a read.
+                    profiler._entry(type(obj), name).read_ns += clock() - start
+
+            patched["__getattr__"] = __getattr__
+        return patched
+
+    @contextmanager
+    def instrument(self, *classes):
+        saved = []
+        try:
+            for cls in classes:
+                patched = self._wrap(cls)
+                saved.append((cls, {name: cls.__dict__.get(name) for name in patched}))
+                for name, func in patched.items():
+                    setattr(cls, name, func)
+            yield self
+        finally:
+            for cls, originals in reversed(saved):
+                for name, original in originals.items():
+                    if original is None:
+                        delattr(cls, name)      # it was inherited: remove our override
+                    else:
+                        setattr(cls, name, original)
+
+    # ============================================================
+    # 3. REPORT
+    # ============================================================
+
+    @staticmethod
+    def suggestion(stats):
+        path = stats.main_path()
+        if path == "__getattr__":
+            return "computed on every miss: store it, or use @lazy"
+        if path == "descriptor" and stats.reads > 10 * max(stats.writes, 1):
+            return "read-mostly property: cache it (@lazy)"
+        if path == "instance dict" and stats.reads + stats.writes >= 1_000:
+            return "hot dict attribute: consider __slots__"
+        return ""
+
+    def hot(self, top=10):
+        return sorted(self.stats.items(), key=lambda item: item[1].total_ns, reverse=True)[:top]
+
+    def report(self, top=10):
+        print(f"{'class.attribute':32} {'reads':>9} {'writes':>8} {'ns/op':>7} {'total ms':>9}"
+              f"  {'path':15} suggestion")
+        for (cls_name, name), stats in self.hot(top):
+            ops = stats.reads + stats.writes
+            print(f"{cls_name + '.' + name:32} {stats.reads:9,} {stats.writes:8,}"
+                  f" {stats.total_ns / ops:7.0f} {stats.total_ns / 1e6:9.2f}"
+                  f"  {stats.main_path():15} {self.suggestion(stats)}")
+
+
+# ============================================================
+# 4. DEMO WITH THE LESSONS' CLASSES
+# ============================================================
+
+class Player:                                   # dunder_dict_attribute.py
+    def __init__(self, name, level):
+        self.name = name
+        self.level = level
+
+
+class SlottedPlayer:
+    __slots__ = ("name", "level")
+
+    def __init__(self, name, level):
+        self.name = name
+        self.level = level
+
+
+class Sensor:                                   # hasattr_function.py
+    def __getattr__(self, name):
+        if name == "temperature":
+            return 72
+        raise AttributeError(name)
+
+
+class Profile:                                  # hasattr_function.py
+    domain = "example.com"
+
+    @property
+    def email(self):
+        return f"user@{self.domain}"
+
+    def greet(self):
+        return "hi"
+
+
+def workload(n):
+    players = [Player(f"p{i}", 1) for i in range(100)]
+    slotted = [SlottedPlayer(f"p{i}", 1) for i in range(100)]
+    sensor, profile = Sensor(), Profile()
+    for i in range(n):
+        p = players[i % 100]
+        p.level = p.level + 1
+        s = slotted[i % 100]
+        s.level = s.level + 1
+        sensor.temperature
+        profile.email
+        if i % 10 == 0:
+            profile.greet()
+            setattr(p, "nickname", "x")          # lesson 3 style dynamic attributes
+            getattr(p, "nickname")
+            delattr(p, "nickname")
+
+
+def demo(n=20_000):
+    print("\n# -----------------------------")
+    print(f"# Profiling {n:,} loop iterations")
+    print("# -----------------------------\n")
+
+    start = time.perf_counter()
+    workload(n)
+    plain = time.perf_counter() - start
+
+    profiler = AttributeProfiler()
+    with profiler.instrument(Player, SlottedPlayer, Sensor, Profile):
+        start = time.perf_counter()
+        workload(n)
+        profiled = time.perf_counter() - start
+    profiler.report()
+
+    print(f"\nworkload: {plain * 1e3:.1f} ms plain, {profiled * 1e3:.1f} ms instrumented")
+    print("restored:", "__getattribute__" not in Player.__dict__ and "__getattr__" in Sensor.__dict__)
+
+
+if __name__ == "__main__":
+    demo()
@@ -0,0 +1,268 @@
+# ============================================================
+#         IDENTITY TRACKER — WEAK REFERENCES, BOUNDED MEMORY
+# ============================================================
+#
+# Description:
+#   is_operator.py (section 6) debugs aliasing with a Tracker that
+#   appends (id, type, repr) to a list forever:
+#     - the list only grows
+#     - every repr string is built up front and kept alive
+#     - id() values are reused after an object is garbage collected,
+#       so "this id was seen before" can be a false match
+#
+#   IdentityTracker can stay enabled in production:
+#     - it holds tracked objects WEAKLY; a weakref callback (a
+#       finalizer) removes an object's entry the moment it dies, so an
+#       id can never match a dead object
+#     - seen(obj) is one dict lookup plus an identity check: O(1)
+#     - history is a ring buffer of the last N events (bounded)
+#     - repr is computed only when someone reads the history
+#     - objects that cannot be weakly referenced (list, dict, str, int,
+#       tuple...) are NOT kept alive: only their id, type and a short
+#       repr (reprlib, so a huge list is never rendered in full) go into
+#       a bounded LRU. Holding the objects themselves would keep
+#       arbitrarily large lists and dicts alive. The price: for these
+#       types seen() matches on id and type, so a dead object's id
+#       reused by a new one of the same type can still match
+#
+# Contents:
+#   1. Lazy repr handles
+#   2. IdentityTracker
+#   3. Demo: aliasing and id reuse
+#   4. Benchmark against the list-based Tracker
+#
+# ============================================================
+
+import gc
+import itertools
+import reprlib
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import OrderedDict, deque, namedtuple
+
+
+# ============================================================
+# 1. LAZY REPR HANDLES
+# ============================================================
+#
+# A history event keeps a handle to the object, not its repr. For a
+# weakly held object the repr is built when the history is read; by
+# then the object may be gone ("<dead Node>"). An object that cannot be
+# weakly referenced is represented by a _Stub whose short repr was
+# taken when it was remembered.
+
+Event = namedtuple("Event", "seq object_id type_name label repr")
+_Stub = namedtuple("_Stub", "type repr")
+
+
+def _render(handle, type_name, limit):
+    if isinstance(handle, _Stub):
+        return handle.repr
+    obj = handle()
+    if obj is None:
+        return f"<dead {type_name}>"
+    text = repr(obj)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+# ============================================================
+# 2. IDENTITYTRACKER
+# ============================================================
+
+class IdentityTracker:
+    def __init__(self, history=1_000, strong_capacity=10_000, repr_limit=80):
+        self.repr_limit = repr_limit
+        self.strong_capacity = strong_capacity
+        self._entries = {}               # id -> KeyedRef, or a _Stub
+        self._strong = OrderedDict()     # id -> None, LRU order of the _Stub entries
+        self._short = reprlib.Repr()
+        self._short.maxstring = self._short.maxother = repr_limit
+        self._counts = {}                # id -> times remembered
+        self._events = deque(maxlen=history)
+        self._seq = itertools.count(1)
+        # Weakref callbacks run during garbage collection, possibly while
+        # this thread already holds the lock: it must be re-entrant.
+        self._lock = threading.RLock()
+        self.stats = {"remembered": 0, "repeats": 0, "purged": 0, "evicted": 0}
+
+    def _purge(self, ref):
+        with self._lock:
+            # Only drop the entry if it still belongs to the dead object.
+            if self._entries.get(ref.key) is ref:
+                del self._entries[ref.key]
+                self._counts.pop(ref.key, None)
+                self.stats["purged"] += 1
+
+    def _lookup(self, obj):
+        entry = self._entries.get(id(obj))
+        if entry is None:
+            return None
+        if isinstance(entry, _Stub):
+            return entry if entry.type is type(obj) else None
+        return entry if entry() is obj else None
+
+    def remember(self, obj, label=None):
+        """Track obj; return True if this exact object was tracked before."""
+        key = id(obj)
+        with self._lock:
+            entry = self._lookup(obj)
+            repeat = entry is not None
+            if repeat:
+                self._counts[key] += 1
+                self.stats["repeats"] += 1
+                if key in self._strong:
+                    self._strong.move_to_end(key)
+            else:
+                # A reused id may still hold a _Stub for a dead object:
+                # whatever replaces it, its LRU slot goes too.
+                self._strong.pop(key, None)
+                try:
+                    entry = weakref.KeyedRef(obj, self._purge, key)
+                except TypeError:                    # not weakly referenceable
+                    entry = _Stub(type(obj), self._short.repr(obj))
+                    self._strong[key] = None
+                    if len(self._strong) > self.strong_capacity:
+                        old_key, _ = self._strong.popitem(last=False)
+                        self._entries.pop(old_key, None)
+                        self._counts.pop(old_key, None)
+                        self.stats["evicted"] += 1
+                self._entries[key] = entry
+                self._counts[key] = 1
+            self.stats["remembered"] += 1
+            self._events.append((next(self._seq), key, type(obj).__name__, label, entry))
+        return repeat
+
+    def seen(self, obj):
+        return self._lookup(obj) is not None
+
+    def count(self, obj):
+        return self._counts[id(obj)] if self.seen(obj) else 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def history(self, last=None):
+        with self._lock:
+            events = list(self._events)
+        if last is not None:
+            events = events[-last:]
+        return [Event(seq, key, type_name, label, _render(handle, type_name, self.repr_limit))
+                for seq, key, type_name, label, handle in events]
+
+    def aliases(self):
+        """Objects remembered more than once (still alive), with counts."""
+        with self._lock:
+            return {key: n for key, n in self._counts.items() if n > 1}
+
+
+# ============================================================
+# 3. DEMO: ALIASING AND ID REUSE
+# ============================================================
+
+class Node:
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"Node({self.value})"
+
+
+class ListTracker:
+    """is_operator.py's Tracker, without the print."""
+
+    def __init__(self):
+        self.history = []
+
+    def remember(self, obj):
+        self.history.append((id(obj), type(obj).__name__, repr(obj)))
+
+    def seen(self, obj):
+        return any(entry[0] == id(obj) for entry in self.history)
+
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Same lesson: target, alias, clone")
+    print("# -----------------------------\n")
+
+    tracker = IdentityTracker(history=5)
+    target = []
+    alias = target
+    clone = target.copy()
+    for name, obj in (("target", target), ("alias", alias), ("clone", clone)):
+        print(f"remember({name}) → seen before: {tracker.remember(obj, label=name)}")
+    target.append("changed later")   # not held: history shows the repr at remember()
+    for event in tracker.history():
+        print("  ", event)
+
+    print("\n# -----------------------------")
+    print("# id() reuse: false match vs weak reference")
+    print("# -----------------------------\n")
+
+    old, new = ListTracker(), IdentityTracker()
+    first = Node(1)
+    old.remember(first)
+    new.remember(first)
+    first_id = id(first)
+    del first                                   # freed; its id may be handed out again
+    second = Node(2)
+    print("same id reused      :", id(second) == first_id)
+    print("list Tracker seen() :", old.seen(second), "(false match)" if old.seen(second) else "")
+    print("IdentityTracker seen:", new.seen(second), "| entries purged:", new.stats["purged"])
+    print("history            :", new.history())
+
+
+# ============================================================
+# 4. BENCHMARK AGAINST THE LIST-BASED TRACKER
+# ============================================================
+
+def _workload(tracker, n):
+    keep = []
+    for i in range(n):
+        node = Node(i)
+        tracker.remember(node)
+        if i % 100 == 0:
+            keep.append(node)                   # 1% stay alive, the rest die
+    return keep
+
+
+def _run(make, n):
+    # Timed and memory-traced separately: tracemalloc slows allocation.
+    gc.collect()
+    start = time.perf_counter()
+    tracker = make()
+    keep = _workload(tracker, n)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for node in keep[:200]:
+        tracker.seen(node)
+    probe = (time.perf_counter() - start) / min(len(keep), 200)
+    del tracker, keep
+
+    gc.collect()
+    tracemalloc.start()
+    tracker = make()
+    keep = _workload(tracker, n)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tracker, keep
+    return elapsed, retained, probe
+
+
+def benchmark(n=200_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: remember {n:,} short-lived objects")
+    print("# -----------------------------\n")
+
+    for label, make in (("list Tracker", ListTracker), ("IdentityTracker", IdentityTracker)):
+        elapsed, retained, probe = _run(make, n)
+        print(f"{label:16}: {elapsed / n * 1e9:6.0f} ns/remember | retained {retained / 1e6:6.1f} MB"
+              f" | seen() {probe * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
@@ -0,0 +1,318 @@
+# ============================================================
+#           LAZY ATTRIBUTES — COMPUTE ONCE, THEN GET OUT OF THE WAY
+# ============================================================
+#
+# Description:
+#   In hasattr_function.py (section 4) Sensor.__getattr__ computes
+#   "temperature" on EVERY access, prints each time, and even
+#   hasattr(sensor, "temperature") runs the computation.
+#
+#   This module turns that pattern into a small framework:
+#     - @lazy computes an attribute on first access and stores the
+#       value in the instance __dict__. @lazy is a NON-data descriptor,
+#       so from then on Python finds the value in __dict__ first and
+#       neither the descriptor nor __getattr__ is involved again.
+#     - @lazy(ttl=seconds) recomputes after the value expires. An
+#       expiring attribute must be checked on every access, so it is a
+#       data descriptor (it defines __set__) and keeps the value under
+#       a private key.
+#     - concurrent first accesses compute ONCE: one thread computes,
+#       the others wait for its result (a lock per instance+attribute)
+#     - is_loaded(obj, name) / peek(obj, name, default) look without
+#       computing; declares_lazy(obj, name) is the side-effect-free
+#       replacement for hasattr(); invalidate(obj, name) forgets
+#
+#   Instances need a __dict__ (no __slots__-only classes).
+#
+# Contents:
+#   1. Shared helpers
+#   2. LazyAttribute (cached forever)
+#   3. ExpiringAttribute (ttl)
+#   4. lazy() and the inspection API
+#   5. Demo: Sensor without __getattr__
+#   6. Benchmark
+#
+# ============================================================
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+# ============================================================
+# 1. SHARED HELPERS
+# ============================================================
+#
+# Each descriptor keeps its per-instance locks itself, keyed by
+# id(obj), and only while someone is computing: the last thread out
+# removes the entry, even when func raises. Nothing is stored in the
+# instance, so vars(), pickle and deepcopy never see a lock. id() works
+# for unhashable and non-weakrefable instances, and cannot be reused
+# while a caller still holds obj.
+
+class _InstanceLocks:
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}                         # id(obj) -> [lock, users]
+
+    @contextmanager
+    def held(self, obj):
+        key = id(obj)
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+# ============================================================
+# 2. LAZYATTRIBUTE (CACHED FOREVER)
+# ============================================================
+
+class LazyAttribute:
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        self._locks = _InstanceLocks()
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        # Only reached while the value is NOT in obj.__dict__ yet.
+        with self._locks.held(obj):
+            try:
+                return obj.__dict__[self.name]      # another thread finished first
+            except KeyError:
+                pass
+            value = self.func(obj)
+            obj.__dict__[self.name] = value
+            return value
+
+    def is_loaded(self, obj):
+        return self.name in obj.__dict__
+
+    def peek(self, obj, default):
+        return obj.__dict__.get(self.name, default)
+
+    def invalidate(self, obj):
+        obj.__dict__.pop(self.name, None)
+
+
+# ============================================================
+# 3. EXPIRINGATTRIBUTE (TTL)
+# ============================================================
+
+class ExpiringAttribute:
+    def __init__(self, func, ttl, clock=time.monotonic):
+        self.func = func
+        self.ttl = ttl
+        self.clock = clock
+        self.__doc__ = func.__doc__
+        self._locks = _InstanceLocks()
+        self.__set_name__(None, func.__name__)
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.slot = f"__lazy_value_{name}"     # (value, expires_at)
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        entry = obj.__dict__.get(self.slot)
+        if entry is not None and entry[1] > self.clock():
+            return entry[0]
+        with self._locks.held(obj):
+            entry = obj.__dict__.get(self.slot)
+            if entry is not None and entry[1] > self.clock():
+                return entry[0]
+            value = self.func(obj)
+            obj.__dict__[self.slot] = (value, self.clock() + self.ttl)
+            return value
+
+    def __set__(self, obj, value):
+        # Assigning pins a value for one ttl, like a fresh computation.
+        obj.__dict__[self.slot] = (value, self.clock() + self.ttl)
+
+    def is_loaded(self, obj):
+        entry = obj.__dict__.get(self.slot)
+        return entry is not None and entry[1] > self.clock()
+
+    def peek(self, obj, default):
+        return obj.__dict__[self.slot][0] if self.is_loaded(obj) else default
+
+    def invalidate(self, obj):
+        obj.__dict__.pop(self.slot, None)
+
+
+# ============================================================
+# 4. lazy() AND THE INSPECTION API
+# ============================================================
+
+def lazy(func=None, *, ttl=None, clock=time.monotonic):
+    """@lazy or @lazy(ttl=30): compute on first access, then cache."""
+
+    def wrap(f):
+        if ttl is None:
+            return LazyAttribute(f)
+        return ExpiringAttribute(f, ttl, clock)
+
+    return wrap(func) if func is not None else wrap
+
+
+def _descriptor(obj, name):
+    attr = getattr(type(obj), name, None)       # class lookup: never computes
+    if not isinstance(attr, (LazyAttribute, ExpiringAttribute)):
+        raise AttributeError(f"{type(obj).__name__}.{name} is not a lazy attribute")
+    return attr
+
+
+def declares_lazy(obj, name):
+    """Like hasattr(), but for lazy attributes and without computing them."""
+    return isinstance(getattr(type(obj), name, None), (LazyAttribute, ExpiringAttribute))
+
+
+def is_loaded(obj, name):
+    return _descriptor(obj, name).is_loaded(obj)
+
+
+def peek(obj, name, default=None):
+    return _descriptor(obj, name).peek(obj, default)
+
+
+def invalidate(obj, name):
+    _descriptor(obj, name).invalidate(obj)
+
+
+# ============================================================
+# 5. DEMO: SENSOR WITHOUT __getattr__
+# ============================================================
+
+class Sensor:
+    def __init__(self, reads=0):
+        self.reads = reads
+
+    @lazy
+    def temperature(self):
+        print("Computing temperature lazily…")
+        self.reads += 1
+        return 72
+
+    @lazy(ttl=0.05)
+    def humidity(self):
+        print("Reading humidity…")
+        self.reads += 1
+        return 40 + self.reads
+
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Computed once, then a plain attribute")
+    print("# -----------------------------\n")
+
+    sensor = Sensor()
+    print("declares_lazy:", declares_lazy(sensor, "temperature"))    # no computation
+    print("is_loaded    :", is_loaded(sensor, "temperature"))
+    print("peek         :", peek(sensor, "temperature", "not yet"))
+    print("value        :", sensor.temperature)                       # prints once
+    print("value again  :", sensor.temperature)                       # silent
+    print("vars()       :", vars(sensor))                             # value only, no lock
+
+    print("\n# -----------------------------")
+    print("# Per-attribute TTL")
+    print("# -----------------------------\n")
+
+    print("humidity:", sensor.humidity, sensor.humidity)
+    time.sleep(0.06)
+    print("after ttl:", sensor.humidity)
+
+    print("\n# -----------------------------")
+    print("# 16 threads, one computation")
+    print("# -----------------------------\n")
+
+    class Slow:
+        calls = 0
+
+        @lazy
+        def report(self):
+            Slow.calls += 1
+            time.sleep(0.05)
+            return "done"
+
+    slow = Slow()
+    threads = [threading.Thread(target=lambda: slow.report) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print("computations:", Slow.calls)
+
+
+# ============================================================
+# 6. BENCHMARK
+# ============================================================
+
+class GetattrSensor:
+    """hasattr_function.py's Sensor, without the print."""
+
+    def __getattr__(self, name):
+        if name == "temperature":
+            return 72
+        raise AttributeError(name)
+
+
+class PropertySensor:
+    @property
+    def temperature(self):
+        return 72
+
+
+class LazySensor:
+    @lazy
+    def temperature(self):
+        return 72
+
+    @lazy(ttl=60)
+    def humidity(self):
+        return 40
+
+
+def _per_access(obj, name, n):
+    get = getattr
+    start = time.perf_counter()
+    for _ in range(n):
+        get(obj, name)
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def benchmark(n=1_000_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: ns per access ({n:,} accesses)")
+    print("# -----------------------------\n")
+
+    warm = LazySensor()
+    warm.temperature
+    warm.humidity
+    for label, obj, name in (
+        ("__getattr__ (every time)", GetattrSensor(), "temperature"),
+        ("@property (every time)", PropertySensor(), "temperature"),
+        ("@lazy after first access", warm, "temperature"),
+        ("@lazy(ttl=60) while fresh", warm, "humidity"),
+    ):
+        print(f"{label:28}: {_per_access(obj, name, n):6.1f} ns")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
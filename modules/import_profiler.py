@@ -0,0 +1,282 @@
+# ============================================================
+#            TOOL — IMPORT-TIME PROFILER & BUDGETS
+# ============================================================
+#
+# Description:
+#   Most lessons in this course run their demos at import time
+#   instead of behind an `if __name__ == "__main__":` guard (see
+#   section 7 of modules_part1.py). Importing them for reuse is
+#   therefore slow and noisy. This tool measures exactly that:
+#
+#     - every module is imported in a FRESH interpreter
+#     - `python -X importtime` reports self and cumulative time
+#     - stdout/stderr output and files created count as side effects
+#     - results are compared against a stored JSON baseline
+#     - regressions are flagged (and the exit code becomes 1)
+#
+# Contents:
+#   1. Measuring one module in a fresh interpreter
+#   2. Parsing `-X importtime` output
+#   3. Storing and loading a baseline
+#   4. Comparing against the baseline (regression rules)
+#   5. Command-line interface
+#
+# Usage:
+#   python3 modules/import_profiler.py                   # profile + compare
+#   python3 modules/import_profiler.py --update-baseline # store new budget
+#   python3 modules/import_profiler.py oop/*.py          # only some files
+#
+# ============================================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "import_baseline.json"
+DEFAULT_TARGETS = ("modules/*.py", "oop/*.py", "builtins/*.py")
+
+# Imports are noisy: ignore differences smaller than this (microseconds),
+# and only flag time regressions above this relative tolerance.
+NOISE_FLOOR_US = 2_000
+DEFAULT_TOLERANCE = 0.25
+
+
+# ============================================================
+# 1. MEASURING ONE MODULE IN A FRESH INTERPRETER
+# ============================================================
+
+# Runs inside the child interpreter. The module's folder goes first on
+# sys.path so the lesson file itself is found. __import__() is used on
+# purpose: importlib.import_module() bypasses the `-X importtime` hook.
+_LOADER = (
+    "import sys; "
+    "sys.path.insert(0, sys.argv[1]); "
+    "__import__(sys.argv[2])"
+)
+
+
+def profile_module(path, timeout=60):
+    """Import `path` once in a new interpreter and describe the cost."""
+    path = Path(path).resolve()
+    name = path.stem
+
+    # A scratch working directory catches files written at import time
+    # (e.g. demos that save "invoice.txt").
+    with tempfile.TemporaryDirectory(prefix="import_profile_") as scratch:
+        try:
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", _LOADER,
+                 str(path.parent), name],
+                cwd=scratch,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+            )
+        except subprocess.TimeoutExpired:
+            return {"module": name, "ok": False, "error": f"timeout after {timeout}s"}
+        created = sorted(p.name for p in Path(scratch).iterdir())
+
+    timings, stderr_lines = parse_importtime(proc.stderr)
+    self_us, cumulative_us = timings.get(name, (0, 0))
+
+    result = {
+        "module": name,
+        "ok": proc.returncode == 0,
+        "self_us": self_us,
+        "cumulative_us": cumulative_us,
+        "stdout_lines": len(proc.stdout.splitlines()),
+        "stdout_bytes": len(proc.stdout.encode()),
+        "stderr_lines": len(stderr_lines),
+        "files_created": created,
+    }
+    if proc.returncode != 0:
+        last = stderr_lines[-1] if stderr_lines else f"exit code {proc.returncode}"
+        result["error"] = last
+    return result
+
+
+def profile_many(paths, repeat=3):
+    """Profile every path `repeat` times and keep the fastest run.
+
+    The minimum is the most stable statistic for timings: slower runs
+    only add noise from the OS scheduler and disk caches.
+    """
+    results = {}
+    for path in paths:
+        runs = [profile_module(path) for _ in range(repeat)]
+        # A failed run reports 0 us; it must not win. If every run failed,
+        # keep the last failure so the error is reported.
+        ok = [r for r in runs if r.get("ok")]
+        best = min(ok, key=lambda r: r["cumulative_us"]) if ok else runs[-1]
+        results[relative_key(path)] = best
+    return results
+
+
+def relative_key(path):
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+# ============================================================
+# 2. PARSING `-X importtime` OUTPUT
+# ============================================================
+#
+# Each line looks like:
+#   import time:       631 |       7895 |   re
+#                     self     cumulative  (indent = nesting)
+#
+# Anything else on stderr was written by the module itself.
+
+def parse_importtime(stderr):
+    """Split stderr into {module: (self_us, cumulative_us)} and other lines."""
+    timings = {}
+    others = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            others.append(line)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line: "self [us] | cumulative | imported package"
+        name = fields[2].strip()
+        timings[name] = (int(fields[0]), int(fields[1]))
+    return timings, others
+
+
+# ============================================================
+# 3. STORING AND LOADING A BASELINE
+# ============================================================
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+# ============================================================
+# 4. COMPARING AGAINST THE BASELINE
+# ============================================================
+#
+# A module regresses when:
+#   - it imported fine before and now fails
+#   - self or cumulative time grew beyond the tolerance (and the
+#     absolute growth is above the noise floor)
+#   - it prints more, or writes new files, at import time
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return a list of human-readable regression messages."""
+    problems = []
+    for key, now in sorted(results.items()):
+        before = baseline.get(key)
+        if before is None:
+            continue  # new module: nothing to compare yet
+
+        if before.get("ok") and not now.get("ok"):
+            problems.append(f"{key}: import now fails ({now.get('error')})")
+            continue
+
+        for field in ("self_us", "cumulative_us"):
+            old, new = before.get(field, 0), now.get(field, 0)
+            if new - old > NOISE_FLOOR_US and new > old * (1 + tolerance):
+                problems.append(f"{key}: {field} {old} → {new} us")
+
+        for field in ("stdout_lines", "stderr_lines"):
+            if now.get(field, 0) > before.get(field, 0):
+                problems.append(
+                    f"{key}: {field} {before.get(field, 0)} → {now.get(field, 0)}"
+                )
+
+        new_files = set(now.get("files_created", [])) - set(before.get("files_created", []))
+        if new_files:
+            problems.append(f"{key}: writes new files at import {sorted(new_files)}")
+    return problems
+
+
+def print_report(results):
+    print(f"{'module':45} {'self ms':>9} {'cum ms':>9} {'lines':>6}  side effects")
+    for key, r in sorted(results.items(), key=lambda kv: -kv[1].get("cumulative_us", 0)):
+        effects = []
+        if r.get("files_created"):
+            effects.append("files=" + ",".join(r["files_created"]))
+        if not r.get("ok"):
+            effects.append("FAILED: " + r.get("error", "?"))
+        print(
+            f"{key:45} {r.get('self_us', 0) / 1000:9.2f} "
+            f"{r.get('cumulative_us', 0) / 1000:9.2f} {r.get('stdout_lines', 0):6}  "
+            + "; ".join(effects)
+        )
+
+
+# ============================================================
+# 5. COMMAND-LINE INTERFACE
+# ============================================================
+
+def collect_targets(patterns):
+    paths = []
+    for pattern in patterns:
+        candidate = Path(pattern)
+        if candidate.is_file():
+            paths.append(candidate)
+        else:
+            paths.extend(sorted(REPO_ROOT.glob(pattern)))
+    # The profiler would otherwise profile itself.
+    return [p for p in paths if p.resolve() != Path(__file__).resolve()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time profiler with baseline budgets.")
+    parser.add_argument("targets", nargs="*", default=list(DEFAULT_TARGETS),
+                        help="files or glob patterns relative to the repo root")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the current results as the new baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = profile_many(collect_targets(args.targets), repeat=args.repeat)
+    print_report(results)
+
+    if args.update_baseline:
+        merged = {**load_baseline(args.baseline), **results}
+        save_baseline(args.baseline, merged)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print("\nNo baseline yet — run with --update-baseline to create one.")
+        return 0
+
+    problems = compare(results, baseline, tolerance=args.tolerance)
+    print()
+    if problems:
+        print("REGRESSIONS:")
+        for message in problems:
+            print("  -", message)
+        return 1
+    print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+# ============================================================
+#        TOOL — SNAPSHOT-BASED WARM START FOR MODULE STATE
+# ============================================================
+#
+# Description:
+#   modules_part2.py (section 4) shows importlib.reload() rebuilding a
+#   module's state from scratch. Every new process does the same:
+#   lookup tables computed at import time are recomputed in each worker.
+#
+#   This tool lets a module DECLARE such precomputed state once:
+#     - the builder runs only when no valid snapshot exists
+#     - the result is serialized to a versioned snapshot file
+#     - later processes map the file with mmap and unpickle it
+#     - the snapshot is invalidated when the source file changes
+#       (SHA-256 of the builder's module) or the declared version bumps
+#
+# Contents:
+#   1. Snapshot file format
+#   2. SnapshotState — declaring precomputed state
+#   3. Example: expensive lookup tables
+#   4. Benchmark: worker startup with and without snapshots
+#
+# Usage:
+#   python3 modules/snapshot_state.py            # run the benchmark
+#   python3 modules/snapshot_state.py --workers 8
+#
+# ============================================================
+
+import argparse
+import functools
+import hashlib
+import inspect
+import mmap
+import os
+import pickle
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+# ============================================================
+# 1. SNAPSHOT FILE FORMAT
+# ============================================================
+#
+#   offset  size  field
+#   0       4     magic b"SNAP"
+#   4       2     format version (this file layout)
+#   6       4     state version (declared by the user)
+#   10      32    SHA-256 of the source that builds the state
+#   42      8     payload length
+#   50      ...   pickle payload
+#
+# Any mismatch means "stale" and the state is rebuilt; so does a file
+# that is empty, cut short or does not unpickle.
+#
+# Unpickling runs code, so a snapshot is only read from a directory
+# private to the current user (created 0700, never a shared /tmp path)
+# and only when the file itself is owned by that user.
+
+MAGIC = b"SNAP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHI32sQ")
+
+# Per-user cache directory, never a path shared with other users.
+DEFAULT_DIRECTORY = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "python_snapshots"
+)
+
+# Errors pickle.loads raises for a damaged or foreign payload.
+_UNPICKLE_ERRORS = (pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+                    IndexError, TypeError, ValueError)
+
+
+def _owned_by_me(st):
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def private_directory(directory):
+    """Create directory (0700); refuse one another user owns or can write to."""
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = directory.stat()
+    if not _owned_by_me(st) or (hasattr(os, "getuid") and st.st_mode & 0o022):
+        raise PermissionError(f"{directory} must be owned by the current user and not "
+                              f"writable by group or others")
+    return directory
+
+
+def source_hash(obj):
+    """SHA-256 of the file that defines `obj` (function, class or module)."""
+    path = inspect.getsourcefile(obj)
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def write_snapshot(path, value, digest, version):
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, version, digest, len(payload))
+
+    private_directory(path.parent)
+    # Write to a temporary file first: readers never see a half-written
+    # snapshot, even when several workers race to create it.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_snapshot(path, digest, version):
+    """Return (True, value) for a valid snapshot, (False, None) otherwise."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return False, None
+
+    with f:
+        st = os.fstat(f.fileno())
+        # mmap refuses an empty file (a crash can leave one behind).
+        if st.st_size < _HEADER.size or not _owned_by_me(st):
+            return False, None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _read_mapped(mm, digest, version)
+
+
+def _read_mapped(mm, digest, version):
+    magic, fmt, stored_version, stored_digest, length = _HEADER.unpack_from(mm)
+    if (magic, fmt, stored_version, stored_digest) != (MAGIC, FORMAT_VERSION, version, digest):
+        return False, None
+    if _HEADER.size + length != len(mm):
+        return False, None
+    # The memoryview slice does not copy: pickle reads straight from
+    # the mapped pages.
+    with memoryview(mm) as view:
+        try:
+            value = pickle.loads(view[_HEADER.size:])
+        except _UNPICKLE_ERRORS:
+            return False, None
+    return True, value
+
+
+# ============================================================
+# 2. SNAPSHOTSTATE — DECLARING PRECOMPUTED STATE
+# ============================================================
+
+class SnapshotState:
+    """Module-level state that is built once and reused across processes.
+
+    Example:
+        TABLES = SnapshotState("tables", build_tables, version=1)
+        primes = TABLES.get()["primes"]
+    """
+
+    def __init__(self, name, builder, *, version=1, directory=None, enabled=True):
+        self.name = name
+        self.builder = builder
+        self.version = version
+        self.directory = Path(directory) if directory else DEFAULT_DIRECTORY
+        self.enabled = enabled
+        self._value = None
+        self._loaded = False
+        self.source = None  # "memory", "snapshot" or "built" after get()
+
+    @property
+    def path(self):
+        # The file stem (not __module__) keeps the name stable whether the
+        # module runs as __main__ or is imported.
+        module = Path(inspect.getsourcefile(self.builder)).stem
+        return self.directory / f"{module}.{self.name}.v{self.version}.snap"
+
+    def get(self):
+        if self._loaded:
+            self.source = "memory"
+            return self._value
+
+        if not self.enabled:
+            self._store(self.builder(), "built")
+            return self._value
+
+        private_directory(self.directory)
+        digest = source_hash(self.builder)
+        ok, value = read_snapshot(self.path, digest, self.version)
+        if ok:
+            self._store(value, "snapshot")
+        else:
+            self._store(self.builder(), "built")
+            write_snapshot(self.path, self._value, digest, self.version)
+        return self._value
+
+    def invalidate(self):
+        self._loaded = False
+        self._value = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _store(self, value, source):
+        self._value = value
+        self._loaded = True
+        self.source = source
+
+
+def snapshot_state(name=None, **options):
+    """Decorator form: @snapshot_state("tables", version=2)."""
+    def decorator(builder):
+        state = SnapshotState(name or builder.__name__, builder, **options)
+        functools.update_wrapper(state, builder, updated=())
+        return state
+    return decorator
+
+
+# ============================================================
+# 3. EXAMPLE: EXPENSIVE LOOKUP TABLES
+# ============================================================
+
+def build_lookup_tables():
+    limit = 3_000_000
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0:2] = b"\x00\x00"
+    for n in range(2, int(limit ** 0.5) + 1):
+        if sieve[n]:
+            sieve[n * n::n] = bytes(len(range(n * n, limit + 1, n)))
+    primes = [n for n in range(limit + 1) if sieve[n]]
+
+    digit_sums = {n: sum(map(int, str(n))) for n in range(200_000)}
+    return {"primes": primes, "digit_sums": digit_sums}
+
+
+LOOKUP_TABLES = SnapshotState("lookup_tables", build_lookup_tables, version=1)
+
+
+# ============================================================
+# 4. BENCHMARK: WORKER STARTUP WITH AND WITHOUT SNAPSHOTS
+# ============================================================
+
+def worker(use_snapshot):
+    """Simulated worker: its 'startup' is getting the tables ready."""
+    LOOKUP_TABLES.enabled = use_snapshot
+    start = time.perf_counter()
+    tables = LOOKUP_TABLES.get()
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.6f} {LOOKUP_TABLES.source} {len(tables['primes'])}")
+
+
+def spawn_workers(count, use_snapshot):
+    timings = []
+    for _ in range(count):
+        args = [sys.executable, __file__, "--worker"]
+        if not use_snapshot:
+            args.append("--no-snapshot")
+        start = time.perf_counter()
+        out = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+        process_total = time.perf_counter() - start
+        state_time, source, _ = out.split()
+        timings.append((process_total, float(state_time), source))
+    return timings
+
+
+def report(label, timings):
+    # Group by where the state came from: the first snapshot worker still
+    # has to build (and write) the file, so it is reported separately.
+    for source in ("built", "snapshot"):
+        group = [t for t in timings if t[2] == source]
+        if not group:
+            continue
+        total = sum(t[0] for t in group) / len(group)
+        state = sum(t[1] for t in group) / len(group)
+        print(
+            f"{label:14} {source:9} x{len(group):<3} process avg {total * 1000:8.1f} ms"
+            f" | state ready in {state * 1000:8.1f} ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot warm-start benchmark.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--no-snapshot", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(use_snapshot=not args.no_snapshot)
+        return
+
+    print("\n# -----------------------------")
+    print("# Worker startup benchmark")
+    print("# -----------------------------\n")
+    print("Snapshot file:", LOOKUP_TABLES.path)
+
+    LOOKUP_TABLES.invalidate()
+    report("no snapshot", spawn_workers(args.workers, use_snapshot=False))
+    # The first snapshot worker builds and writes the file; the rest load it.
+    report("with snapshot", spawn_workers(args.workers, use_snapshot=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# ============================================================
+#     OOP AT SCALE — STRUCTURED, ASYNCHRONOUS FileLogger
+# ============================================================
+#
+# Description:
+#   The Pure Fabrication example (grasp_principles.py, section 7) has a
+#   FileLogger whose log() just prints. A real file logger that writes
+#   synchronously puts the disk on the request thread: every slow
+#   write or fsync shows up as request latency.
+#
+#   AsyncFileLogger keeps log(text) working and hands records off:
+#     - the request thread only builds a small tuple and enqueues it
+#     - a dedicated thread formats, batches and writes the records
+#     - records are structured: time, level, message template, args,
+#       extra fields (JSON Lines by default; the encoder is pluggable)
+#     - files rotate by size (app.log → app.log.1 → app.log.2 ...)
+#     - a full queue either BLOCKS the caller or DROPS records
+#       ("drop_new" / "drop_old"), by policy, with counters
+#     - a batch that fails to encode or write is counted and dropped;
+#       the writer thread keeps running
+#
+# Contents:
+#   1. Log levels and records
+#   2. JSON Lines encoder
+#   3. AsyncFileLogger
+#   4. Benchmark: request-thread overhead per log call
+#
+# ============================================================
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from grasp_principles import FileLogger
+
+
+# ============================================================
+# 1. LOG LEVELS AND RECORDS
+# ============================================================
+#
+# A record is a plain tuple — the cheapest thing to build on the
+# request thread:
+#   (timestamp_ns, level, template, args, fields)
+# The message is rendered (template % args) on the writer thread.
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: number for number, name in LEVEL_NAMES.items()}
+
+# Extra fields sit next to these keys in an entry; they may not replace
+# them (like logging's "Attempt to overwrite ... in LogRecord").
+RESERVED_FIELDS = frozenset({"ts", "level", "msg"})
+
+
+def render(template, args):
+    if not args:
+        return template
+    try:
+        return template % args
+    except (TypeError, ValueError):
+        return f"{template} {args!r}"
+
+
+# ============================================================
+# 2. JSON LINES ENCODER
+# ============================================================
+#
+# Encoders turn a batch of records into bytes. start_file() lets an
+# encoder write a header whenever a new file is opened (rotation); an
+# optional resume(path) is called when appending to an existing file,
+# and an optional check_level(level) rejects levels the format cannot
+# store while log() can still raise to the caller.
+
+class JsonLinesEncoder:
+    def start_file(self, f):
+        pass
+
+    def encode(self, records):
+        lines = []
+        for ts_ns, level, template, args, fields in records:
+            entry = {
+                "ts": ts_ns / 1e9,
+                "level": LEVEL_NAMES.get(level, str(level)),
+                "msg": render(template, args),
+            }
+            if fields:
+                entry.update(fields)
+            lines.append(json.dumps(entry, default=str))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# ============================================================
+# 3. ASYNCFILELOGGER
+# ============================================================
+
+class AsyncFileLogger(FileLogger):
+    """Queue hand-off logger: log() enqueues, a writer thread does the I/O."""
+
+    POLICIES = ("block", "drop_new", "drop_old")
+
+    def __init__(self, path, *, encoder=None, level=INFO, max_queue=100_000,
+                 policy="block", batch_size=1_000, flush_interval=0.2,
+                 max_bytes=10 << 20, backup_count=5):
+        if policy not in self.POLICIES:
+            raise ValueError(f"policy must be one of {self.POLICIES}")
+        self.path = Path(path)
+        self.encoder = encoder or JsonLinesEncoder()
+        self._check_level = getattr(self.encoder, "check_level", None)
+        self.level = level
+        self.max_queue = max_queue
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._writing = False
+        self.last_error = None
+        self.stats = {"logged": 0, "dropped": 0, "written": 0, "batches": 0, "rotations": 0,
+                      "failed_batches": 0, "lost": 0}
+
+        self._file = self._open()
+        self._thread = threading.Thread(target=self._run, name="async-file-logger", daemon=True)
+        self._thread.start()
+
+    # -------- request thread --------
+
+    def log(self, text, *args, level=INFO, **fields):
+        if level < self.level:
+            return
+        if fields and not RESERVED_FIELDS.isdisjoint(fields):
+            raise ValueError(f"fields may not overwrite {sorted(RESERVED_FIELDS & fields.keys())}")
+        if self._check_level is not None:
+            self._check_level(level)
+        record = (time.time_ns(), level, text, args, fields)
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "drop_new":
+                    self.stats["dropped"] += 1
+                    return
+                if self.policy == "drop_old":
+                    self._queue.popleft()
+                    self.stats["dropped"] += 1
+                else:
+                    self._cond.notify_all()
+                    self._cond.wait_for(lambda: len(self._queue) < self.max_queue or self._closed)
+            if self._closed:
+                raise RuntimeError("logger is closed")
+            self._queue.append(record)
+            self.stats["logged"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+
+    def debug(self, text, *args, **fields):
+        self.log(text, *args, level=DEBUG, **fields)
+
+    def info(self, text, *args, **fields):
+        self.log(text, *args, level=INFO, **fields)
+
+    def warning(self, text, *args, **fields):
+        self.log(text, *args, level=WARNING, **fields)
+
+    def error(self, text, *args, **fields):
+        self.log(text, *args, level=ERROR, **fields)
+
+    # -------- writer thread --------
+
+    def _open(self):
+        f = open(self.path, "ab")
+        if f.tell() == 0:
+            self.encoder.start_file(f)
+        elif hasattr(self.encoder, "resume"):
+            self.encoder.resume(self.path)    # stateful encoders re-read the file
+            f.seek(0, os.SEEK_END)            # resume() may have truncated a torn tail
+        return f
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            older = Path(f"{self.path}.{i}")
+            if older.exists():
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.unlink(self.path)
+        self._file = self._open()
+        self.stats["rotations"] += 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._queue) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_size))]
+                self._writing = bool(batch)
+                self._cond.notify_all()           # wake blocked producers
+                if not batch and self._closed:
+                    return
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        failed = None
+        try:
+            if self._file.closed:               # a failed rotation left no file open
+                self._file = self._open()
+            # Rotate BEFORE encoding: a stateful encoder (see binary_logs.py)
+            # must encode the batch against the file it will land in.
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+            data = self.encoder.encode(batch)
+            self._file.write(data)
+            self._file.flush()
+        except Exception as exc:
+            # The writer thread must survive: flush() and blocked log()
+            # calls wait for it.
+            failed = exc
+        finally:
+            with self._cond:
+                if failed is None:
+                    self.stats["written"] += len(batch)
+                    self.stats["batches"] += 1
+                else:
+                    self.stats["failed_batches"] += 1
+                    self.stats["lost"] += len(batch)
+                    self.last_error = repr(failed)
+                self._writing = False
+                self._cond.notify_all()
+
+    # -------- control --------
+
+    def flush(self):
+        with self._cond:
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._queue and not self._writing)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# 4. BENCHMARK: REQUEST-THREAD OVERHEAD PER LOG CALL
+# ============================================================
+
+class SyncFileLogger(FileLogger):
+    """The naive version: format and write on the caller's thread."""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def log(self, text, *args, level=INFO, **fields):
+        entry = {"ts": time.time(), "level": LEVEL_NAMES[level], "msg": render(text, args), **fields}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _per_call(logger, n):
+    start = time.perf_counter()
+    for i in range(n):
+        logger.log("payment %s received from %s", i, "alex", level=INFO, amount=99, currency="EUR")
+    return (time.perf_counter() - start) / n
+
+
+def benchmark(n=100_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {n:,} structured log calls")
+    print("# -----------------------------\n")
+
+    with tempfile.TemporaryDirectory(prefix="async_logger_") as tmp:
+        sync = SyncFileLogger(Path(tmp) / "sync.log")
+        sync_cost = _per_call(sync, n)
+        sync.close()
+        print(f"SyncFileLogger  : {sync_cost * 1e6:6.2f} us per call on the request thread")
+
+        with AsyncFileLogger(Path(tmp) / "async.log", max_bytes=4 << 20) as logger:
+            async_cost = _per_call(logger, n)
+            logger.flush()
+            stats = dict(logger.stats)
+        print(f"AsyncFileLogger : {async_cost * 1e6:6.2f} us per call on the request thread")
+        print("Writer stats    :", stats)
+        print("Files           :", sorted(p.name for p in Path(tmp).iterdir()))
+
+        with AsyncFileLogger(Path(tmp) / "drop.log", max_queue=100, policy="drop_new") as lossy:
+            for i in range(10_000):
+                lossy.info("burst %d", i)
+        print("drop_new policy :", lossy.stats)
+
+
+def demo():
+    print("\n# -----------------------------")
+    print("# AsyncFileLogger is still a FileLogger")
+    print("# -----------------------------\n")
+    with tempfile.TemporaryDirectory(prefix="async_logger_") as tmp:
+        path = Path(tmp) / "app.log"
+        with AsyncFileLogger(path) as logger:
+            logger.log("Payment received")                       # GRASP call style
+            logger.warning("Retrying gateway %s", "card", attempt=2)
+        print(path.read_text(encoding="utf-8"), end="")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
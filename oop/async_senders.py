@@ -0,0 +1,359 @@
+# ============================================================
+#     OOP AT SCALE — ASYNC MESSAGE SENDERS WITH CONNECTION POOLING
+# ============================================================
+#
+# Description:
+#   MessageSender.send(to, message) in solid_principles.py is a
+#   blocking, per-message call with no notion of a connection. Real
+#   SMTP/SMS gateways charge a handshake per connection, so opening
+#   one per message caps throughput long before the network does.
+#
+#   This lesson keeps the DIP abstraction but makes it async:
+#     - AsyncMessageSender: `await send(...)`, `await send_many(...)`
+#     - ConnectionPool: max size, idle timeout, health check on reuse
+#     - pipelined sends: write N commands, then read N replies
+#     - FakeSMTPServer: a local line-protocol stand-in with a slow
+#       handshake, used by the demo and the benchmark
+#     - messages/s and p99 send latency with pooling on and off
+#
+# Contents:
+#   1. Async sender interface
+#   2. Local fake SMTP server
+#   3. Connection with pipelining
+#   4. ConnectionPool
+#   5. Pooled and unpooled senders
+#   6. Benchmark
+#
+# ============================================================
+
+import asyncio
+import time
+
+from solid_principles import MessageSender
+
+
+# ============================================================
+# 1. ASYNC SENDER INTERFACE
+# ============================================================
+#
+# Same contract as MessageSender, but awaitable. send_many() has a
+# naive default so simple senders only implement send().
+
+class AsyncMessageSender:
+    async def send(self, to, message):
+        raise NotImplementedError
+
+    async def send_many(self, messages):
+        for to, message in messages:
+            await self.send(to, message)
+
+    async def close(self):
+        pass
+
+
+# ============================================================
+# 2. LOCAL FAKE SMTP SERVER
+# ============================================================
+#
+# Protocol (one line per command):
+#   server greets with "220 ready" after `handshake_delay`
+#   "SEND <to> <message>"  → "250 OK"
+#   "NOOP"                 → "250 OK"   (used for health checks)
+#   "QUIT"                 → "221 bye" and close
+
+class FakeSMTPServer:
+    def __init__(self, handshake_delay=0.005, per_message_delay=0.0):
+        self.handshake_delay = handshake_delay
+        self.per_message_delay = per_message_delay
+        self.connections = 0
+        self.delivered = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        await asyncio.sleep(self.handshake_delay)   # TLS + EHLO stand-in
+        writer.write(b"220 ready\n")
+        try:
+            while line := await reader.readline():
+                command = line.split(b" ", 1)[0].strip()
+                if command == b"SEND":
+                    if self.per_message_delay:
+                        await asyncio.sleep(self.per_message_delay)
+                    self.delivered += 1
+                    writer.write(b"250 OK\n")
+                elif command == b"NOOP":
+                    writer.write(b"250 OK\n")
+                elif command == b"QUIT":
+                    writer.write(b"221 bye\n")
+                    break
+                else:
+                    writer.write(b"500 unknown command\n")
+                await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+
+# ============================================================
+# 3. CONNECTION WITH PIPELINING
+# ============================================================
+
+class SendError(Exception):
+    """Raised when the server rejects a command."""
+
+
+class Connection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.last_used = time.monotonic()
+        self._reader = None
+        self._writer = None
+
+    async def open(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        greeting = await self._reader.readline()
+        if not greeting.startswith(b"220"):
+            await self.close()               # don't leak the socket
+            raise SendError(f"bad greeting: {greeting!r}")
+        return self
+
+    @property
+    def is_open(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def send_batch(self, messages):
+        """Pipeline: write every command first, then read every reply."""
+        for to, message in messages:
+            text = str(message).replace("\n", " ")
+            self._writer.write(f"SEND {to} {text}\n".encode())
+        await self._writer.drain()
+        for _ in messages:
+            reply = await self._reader.readline()
+            if not reply.startswith(b"250"):
+                raise SendError(reply.decode().strip() or "connection closed")
+        self.last_used = time.monotonic()
+
+    async def ping(self):
+        self._writer.write(b"NOOP\n")
+        await self._writer.drain()
+        return (await self._reader.readline()).startswith(b"250")
+
+    async def close(self):
+        if self.is_open:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+# ============================================================
+# 4. CONNECTIONPOOL
+# ============================================================
+
+class ConnectionPool:
+    """Reuses open connections.
+
+    - at most `max_size` connections exist at once (a semaphore)
+    - idle connections older than `idle_timeout` are closed on acquire
+    - a reused connection must pass `health_check` (NOOP round trip)
+      if it has been idle longer than `check_after`
+    """
+
+    def __init__(self, factory, *, max_size=10, idle_timeout=30.0, check_after=1.0):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self._idle = []                      # LIFO: warmest connection first
+        self._slots = asyncio.Semaphore(max_size)
+        self._closing = set()                # close() tasks started by release()
+        self.created = 0
+        self.discarded = 0
+        self.close_errors = 0
+
+    async def acquire(self):
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                idle_for = time.monotonic() - conn.last_used
+                if idle_for > self.idle_timeout or not conn.is_open:
+                    await self._discard(conn)
+                    continue
+                if idle_for > self.check_after and not await self._healthy(conn):
+                    await self._discard(conn)
+                    continue
+                return conn
+            self.created += 1
+            return await self.factory()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn, *, broken=False):
+        if broken or not conn.is_open:
+            self.discarded += 1
+            # release() is synchronous, so the close runs as a task. The
+            # set keeps it from being garbage-collected mid-close; close()
+            # awaits whatever is still running.
+            task = asyncio.ensure_future(conn.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closed)
+        else:
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+        self._slots.release()
+
+    def connection(self):
+        return _PooledConnection(self)
+
+    async def _healthy(self, conn):
+        try:
+            return await asyncio.wait_for(conn.ping(), timeout=1.0)
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+    def _closed(self, task):
+        self._closing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.close_errors += 1
+
+    async def _discard(self, conn):
+        self.discarded += 1
+        await conn.close()
+
+    async def close(self):
+        while self._idle:
+            await self._idle.pop().close()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+
+class _PooledConnection:
+    """`async with pool.connection() as conn:` — returns it even on errors."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.conn = None
+
+    async def __aenter__(self):
+        self.conn = await self.pool.acquire()
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.pool.release(self.conn, broken=exc_type is not None)
+
+
+# ============================================================
+# 5. POOLED AND UNPOOLED SENDERS
+# ============================================================
+
+class PooledSmtpSender(AsyncMessageSender):
+    def __init__(self, host, port, **pool_options):
+        async def factory():
+            return await Connection(host, port).open()
+        self.pool = ConnectionPool(factory, **pool_options)
+
+    async def send(self, to, message):
+        await self.send_many([(to, message)])
+
+    async def send_many(self, messages):
+        async with self.pool.connection() as conn:
+            await conn.send_batch(messages)
+
+    async def close(self):
+        await self.pool.close()
+
+
+class UnpooledSmtpSender(AsyncMessageSender):
+    """One connection per call — what a naive port of send() does."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def send(self, to, message):
+        conn = await Connection(self.host, self.port).open()
+        try:
+            await conn.send_batch([(to, message)])
+        finally:
+            await conn.close()
+
+
+class BlockingSenderAdapter(MessageSender):
+    """Lets synchronous code (NotificationService) use an async sender."""
+
+    def __init__(self, async_sender, loop):
+        self.async_sender = async_sender
+        self.loop = loop  # an event loop running in another thread
+
+    def send(self, to, message):
+        future = asyncio.run_coroutine_threadsafe(self.async_sender.send(to, message), self.loop)
+        future.result()
+
+
+# ============================================================
+# 6. BENCHMARK
+# ============================================================
+
+async def _drive(sender, n, concurrency):
+    latencies = []
+    counter = iter(range(n))
+
+    async def client():
+        for i in counter:
+            start = time.perf_counter()
+            await sender.send(f"user{i}@example.com", "Welcome!")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies[int(0.99 * (len(latencies) - 1))]
+
+
+async def benchmark(n=2_000, concurrency=20):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {n:,} sends, {concurrency} concurrent clients, 5 ms handshake")
+    print("# -----------------------------\n")
+
+    server = await FakeSMTPServer(handshake_delay=0.005).start()
+
+    cases = [
+        ("pooling off", UnpooledSmtpSender(server.host, server.port)),
+        ("pooling on", PooledSmtpSender(server.host, server.port, max_size=concurrency)),
+    ]
+    for label, sender in cases:
+        before = server.connections
+        elapsed, p99 = await _drive(sender, n, concurrency)
+        await sender.close()
+        print(f"{label:12}: {n / elapsed:10,.0f} msg/s | p99 {p99 * 1000:7.2f} ms"
+              f" | connections opened: {server.connections - before}")
+
+    pooled = PooledSmtpSender(server.host, server.port, max_size=4)
+    batch = [(f"user{i}@example.com", "Digest") for i in range(n)]
+    start = time.perf_counter()
+    await asyncio.gather(*(pooled.send_many(batch[i:i + 500]) for i in range(0, n, 500)))
+    elapsed = time.perf_counter() - start
+    await pooled.close()
+    print(f"{'pipelined':12}: {n / elapsed:10,.0f} msg/s | batches of 500 over 4 connections")
+
+    await server.stop()
+    print("\nServer delivered:", server.delivered, "messages")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,661 @@
+# ============================================================
+#     OOP AT SCALE — PERSISTENT, JOURNALED BankAccount LEDGER
+# ============================================================
+#
+# Description:
+#   Every BankAccount in the lessons (oop_basics_lesson1.py,
+#   error_handling_oop.py, decorators/property.py) keeps its balance as
+#   a float in memory: no durability, no concurrency control, and
+#   0.1 + 0.2 rounding drift.
+#
+#   Ledger is the engine behind the same deposit/withdraw API:
+#     - balances are integer cents
+#     - every posting is appended to a journal; a writer thread
+#       commits whatever has queued up in ONE write + fsync
+#       ("group commit"), and callers wait only for their own posting
+#     - accounts are guarded by striped locks (account id → one of N
+#       locks), so transfers between unrelated accounts don't wait on
+#       each other; a transfer takes its two stripes in a fixed order
+#     - snapshots write all balances and start a new journal segment,
+#       so recovery = load snapshot + replay only the tail
+#
+#   LedgerBankAccount keeps error_handling_oop.BankAccount's interface
+#   and exceptions on top of it.
+#
+# Contents:
+#   1. Journal records
+#   2. Journal with group commit
+#   3. Ledger: striped locks, postings, snapshots, recovery
+#   4. LedgerBankAccount
+#   5. Demo
+#   6. Benchmark: postings per second
+#
+# ============================================================
+
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from error_handling_oop import BankAccount, InsufficientFundsError, NegativeAmountError
+from id_allocation import BlockAllocator
+from running_totals import from_cents, to_cents
+from withdrawal_results import INSUFFICIENT_FUNDS, NOT_POSITIVE, OK
+
+
+# ============================================================
+# 1. JOURNAL RECORDS
+# ============================================================
+#
+# A commit is one frame:  payload_len: u32 | crc32: u32 | payload
+# The payload is a run of postings:
+#   op: u8 | account: u64 | other: u64 | cents: i64
+# and OPEN postings are followed by  owner_len: u16 | owner (utf-8).
+# A torn frame at the end of the journal (crash mid-write) fails its
+# CRC and is cut off on recovery: a commit is all or nothing.
+
+_FRAME = struct.Struct("<II")
+_POSTING = struct.Struct("<BQQq")
+_OWNER_LEN = struct.Struct("<H")
+
+OPEN, DEPOSIT, WITHDRAW, TRANSFER = 1, 2, 3, 4
+
+
+def encode_open(account, owner, cents):
+    owner_bytes = owner.encode("utf-8")
+    return _POSTING.pack(OPEN, account, 0, cents) + _OWNER_LEN.pack(len(owner_bytes)) + owner_bytes
+
+
+def iter_postings(payload):
+    offset = 0
+    while offset < len(payload):
+        op, account, other, cents = _POSTING.unpack_from(payload, offset)
+        offset += _POSTING.size
+        owner = None
+        if op == OPEN:
+            (length,) = _OWNER_LEN.unpack_from(payload, offset)
+            offset += _OWNER_LEN.size
+            owner = bytes(payload[offset:offset + length]).decode("utf-8")
+            offset += length
+        yield op, account, other, cents, owner
+
+
+# ============================================================
+# 2. JOURNAL WITH GROUP COMMIT
+# ============================================================
+#
+# Every posting gets a log sequence number (LSN). Segments are named
+# after the LSN they start after: journal-000000001000.log holds LSNs
+# 1001, 1002, ...  append() assigns the LSN; wait(lsn) blocks until
+# the writer has made that LSN (and therefore everything before it)
+# durable.
+
+class Journal:
+    def __init__(self, directory, base_lsn, fsync=True):
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self.last_lsn = base_lsn
+        self.durable_lsn = base_lsn
+        self._pending = []
+        self._writing = False
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+        self.stats = {"commits": 0, "postings": 0, "bytes": 0}
+        self._file = open(self.segment_path(base_lsn), "ab")
+        self._thread = threading.Thread(target=self._run, name="ledger-journal", daemon=True)
+        self._thread.start()
+
+    def segment_path(self, base_lsn):
+        return self.directory / f"journal-{base_lsn:012d}.log"
+
+    # -------- callers --------
+
+    def append(self, *payloads):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("journal is closed")
+            if self._error is not None:
+                # The writer stopped: nothing more can be made durable.
+                raise RuntimeError("journal failed; ledger is read-only") from self._error
+            self._pending.extend(payloads)
+            self.last_lsn += len(payloads)
+            self._cond.notify_all()
+            return self.last_lsn
+
+    def wait(self, lsn):
+        with self._cond:
+            self._cond.wait_for(lambda: self.durable_lsn >= lsn or self._error is not None)
+            if self.durable_lsn < lsn:                 # written before the failure: durable
+                raise self._error
+
+    def rotate(self):
+        """Start a new segment at last_lsn. Caller must block new appends."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._error is not None or (not self._pending and not self._writing))
+            if self._error is not None:
+                raise RuntimeError("journal failed; ledger is read-only") from self._error
+            self._file.close()
+            self._file = open(self.segment_path(self.last_lsn), "ab")
+            return self.last_lsn
+
+    # -------- writer thread --------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                upto = self.last_lsn
+                self._writing = True
+            payload = b"".join(batch)
+            try:
+                self._file.write(_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            except Exception as exc:                # not only OSError: waiters must wake
+                with self._cond:
+                    self._error = exc
+                    self._writing = False
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self.durable_lsn = upto
+                self._writing = False
+                self.stats["commits"] += 1
+                self.stats["postings"] += len(batch)
+                self.stats["bytes"] += _FRAME.size + len(payload)
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._file.close()
+
+
+def read_segment(path):
+    """Yield each committed payload; truncate a torn tail in place."""
+    blob = path.read_bytes()
+    view = memoryview(blob)
+    offset = 0
+    while offset + _FRAME.size <= len(blob):
+        length, crc = _FRAME.unpack_from(blob, offset)
+        start = offset + _FRAME.size
+        end = start + length
+        if end > len(blob) or zlib.crc32(view[start:end]) != crc:
+            break
+        yield view[start:end]
+        offset = end
+    if offset != len(blob):
+        os.truncate(path, offset)
+
+
+# ============================================================
+# 3. LEDGER: STRIPED LOCKS, POSTINGS, SNAPSHOTS, RECOVERY
+# ============================================================
+#
+# Postings are appended to the journal FIRST and then applied in
+# memory, both while the account stripes are held: the journal order
+# matches the order in which each account changed, and a failed append
+# (closed or failed journal) leaves the balances untouched. Durability
+# is awaited AFTER releasing the locks — that is what lets many
+# postings share one fsync. Since
+# commits are in LSN order, once a posting is durable so is everything
+# it could have depended on.
+#
+# Snapshot layout:
+#   magic "SNP1" | lsn: u64 | count: u64 | ids: u64[count]
+#   | cents: i64[count] | owners joined by "\0" (utf-8)
+
+_SNAPSHOT = struct.Struct("<4sQQ")
+
+
+class Ledger:
+    def __init__(self, directory, *, fsync=True, stripes=1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.balances = {}                  # account id -> cents
+        self.owners = {}                    # account id -> owner name
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._open_lock = threading.Lock()
+        self.recovery = {}
+        base_lsn = self._recover()
+        self._ids = BlockAllocator(start=max(self.balances, default=0) + 1)
+        self.journal = Journal(self.directory, base_lsn, fsync=fsync)
+
+    # -------- locks --------
+
+    def _stripe(self, account):
+        return self._locks[account % len(self._locks)]
+
+    def _pair(self, a, b):
+        # Always lock the lower stripe first, so two opposite transfers
+        # can't each hold one lock and wait for the other.
+        n = len(self._locks)
+        i, j = sorted((a % n, b % n))
+        if i == j:
+            return self._locks[i], None
+        return self._locks[i], self._locks[j]
+
+    # -------- postings --------
+
+    def open_account(self, owner, cents=0, durable=True):
+        if cents < 0:
+            raise ValueError("Initial balance cannot be negative.")
+        with self._open_lock:
+            account = self._ids.next()
+            with self._stripe(account):
+                lsn = self.journal.append(encode_open(account, owner, cents))
+                self.balances[account] = cents
+                self.owners[account] = owner
+        if durable:
+            self.journal.wait(lsn)
+        return account
+
+    def open_accounts(self, rows):
+        """Bulk open from (owner, cents) rows: one journal append, one wait."""
+        rows = list(rows)
+        if any(cents < 0 for _, cents in rows):
+            raise ValueError("Initial balance cannot be negative.")
+        payloads, accounts = [], []
+        with self._open_lock:
+            for owner, cents in rows:
+                account = self._ids.next()
+                payloads.append(encode_open(account, owner, cents))
+                accounts.append(account)
+            lsn = self.journal.append(*payloads)
+            for account, (owner, cents) in zip(accounts, rows):
+                self.balances[account] = cents
+                self.owners[account] = owner
+        self.journal.wait(lsn)
+        return accounts
+
+    def balance(self, account):
+        return self.balances[account]
+
+    def deposit(self, account, cents, durable=True):
+        if cents <= 0:
+            raise NegativeAmountError("Deposit must be positive.")
+        with self._stripe(account):
+            balance = self.balances[account] + cents
+            lsn = self.journal.append(_POSTING.pack(DEPOSIT, account, 0, cents))
+            self.balances[account] = balance
+        if durable:
+            self.journal.wait(lsn)
+        return balance
+
+    def withdraw(self, account, cents, durable=True):
+        if cents <= 0:
+            raise NegativeAmountError("Withdrawal must be positive.")
+        with self._stripe(account):
+            balance = self.balances[account]
+            if cents > balance:
+                raise InsufficientFundsError(
+                    f"Not enough funds: tried {from_cents(cents)}, available {from_cents(balance)}"
+                )
+            balance -= cents
+            lsn = self.journal.append(_POSTING.pack(WITHDRAW, account, 0, cents))
+            self.balances[account] = balance
+        if durable:
+            self.journal.wait(lsn)
+        return balance
+
+    def try_withdraw(self, account, cents, durable=True):
+        """Like withdraw(), but returns a WithdrawStatus instead of raising."""
+        if cents <= 0:
+            return NOT_POSITIVE
+        with self._stripe(account):
+            balance = self.balances[account]
+            if cents > balance:
+                return INSUFFICIENT_FUNDS
+            lsn = self.journal.append(_POSTING.pack(WITHDRAW, account, 0, cents))
+            self.balances[account] = balance - cents
+        if durable:
+            self.journal.wait(lsn)
+        return OK
+
+    def apply_withdrawals(self, rows):
+        """Post (account, cents) rows; return a bytearray of WithdrawStatus codes."""
+        codes = bytearray(len(rows))
+        balances, journal, last = self.balances, self.journal, None
+        for i, (account, cents) in enumerate(rows):
+            if cents <= 0:
+                codes[i] = NOT_POSITIVE
+                continue
+            with self._stripe(account):
+                balance = balances[account]
+                if cents > balance:
+                    codes[i] = INSUFFICIENT_FUNDS
+                    continue
+                last = journal.append(_POSTING.pack(WITHDRAW, account, 0, cents))
+                balances[account] = balance - cents
+        if last is not None:
+            journal.wait(last)
+        return codes
+
+    def _transfer_locked(self, source, target, cents):
+        balances = self.balances
+        if target not in balances:
+            raise KeyError(target)
+        if cents > balances[source]:
+            return None
+        lsn = self.journal.append(_POSTING.pack(TRANSFER, source, target, cents))
+        balances[source] -= cents
+        balances[target] += cents
+        return lsn
+
+    def transfer(self, source, target, cents, durable=True):
+        if cents <= 0:
+            raise NegativeAmountError("Transfer must be positive.")
+        first, second = self._pair(source, target)
+        with first:
+            if second is None:
+                lsn = self._transfer_locked(source, target, cents)
+            else:
+                with second:
+                    lsn = self._transfer_locked(source, target, cents)
+        if lsn is None:
+            raise InsufficientFundsError(f"Not enough funds in account {source}")
+        if durable:
+            self.journal.wait(lsn)
+
+    def transfer_many(self, transfers):
+        """Post (source, target, cents) rows; one durability wait for all.
+
+        Returns a list of booleans: False where funds were insufficient
+        or the amount was not positive.
+        """
+        results, last = [], None
+        for source, target, cents in transfers:
+            if cents <= 0:
+                results.append(False)
+                continue
+            first, second = self._pair(source, target)
+            with first:
+                if second is None:
+                    lsn = self._transfer_locked(source, target, cents)
+                else:
+                    with second:
+                        lsn = self._transfer_locked(source, target, cents)
+            results.append(lsn is not None)
+            last = lsn or last
+        if last is not None:
+            self.journal.wait(last)
+        return results
+
+    # -------- snapshots --------
+
+    def _lock_everything(self):
+        self._open_lock.acquire()
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_everything(self):
+        for lock in reversed(self._locks):
+            lock.release()
+        self._open_lock.release()
+
+    def snapshot(self, prune=True):
+        """Write all balances; later recovery replays only newer postings.
+
+        Postings pause only while balances are copied and the journal
+        drains into its current segment — the file is written after.
+        """
+        self._lock_everything()
+        try:
+            lsn = self.journal.rotate()
+            ids = array("Q", self.balances.keys())
+            cents = array("q", self.balances.values())
+            owners = [self.owners[account] for account in ids]
+        finally:
+            self._unlock_everything()
+
+        path = self.directory / f"snapshot-{lsn:012d}.bin"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_SNAPSHOT.pack(b"SNP1", lsn, len(ids)))
+            f.write(ids.tobytes())
+            f.write(cents.tobytes())
+            f.write("\0".join(owners).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+        if prune:
+            for old in self.directory.glob("snapshot-*.bin"):
+                if old != path:
+                    old.unlink()
+            for old in self.directory.glob("journal-*.log"):
+                if int(old.stem.split("-")[1]) < lsn:
+                    old.unlink()
+        return lsn
+
+    # -------- recovery --------
+
+    def _load_snapshot(self):
+        snapshots = sorted(self.directory.glob("snapshot-*.bin"))
+        if not snapshots:
+            return 0
+        blob = snapshots[-1].read_bytes()
+        magic, lsn, count = _SNAPSHOT.unpack_from(blob)
+        if magic != b"SNP1":
+            raise ValueError(f"{snapshots[-1]} is not a ledger snapshot")
+        offset = _SNAPSHOT.size
+        ids = array("Q")
+        ids.frombytes(blob[offset:offset + 8 * count])
+        offset += 8 * count
+        cents = array("q")
+        cents.frombytes(blob[offset:offset + 8 * count])
+        offset += 8 * count
+        owners = blob[offset:].decode("utf-8").split("\0") if count else []
+        self.balances = dict(zip(ids, cents))
+        self.owners = dict(zip(ids, owners))
+        return lsn
+
+    def _replay(self, payload):
+        balances, owners, count = self.balances, self.owners, 0
+        for op, account, other, cents, owner in iter_postings(payload):
+            if op == OPEN:
+                balances[account] = cents
+                owners[account] = owner
+            elif op == DEPOSIT:
+                balances[account] += cents
+            elif op == WITHDRAW:
+                balances[account] -= cents
+            elif op == TRANSFER:
+                balances[account] -= cents
+                balances[other] += cents
+            count += 1
+        return count
+
+    def _recover(self):
+        start = time.perf_counter()
+        lsn = snapshot_lsn = self._load_snapshot()
+        segments = sorted(
+            (int(p.stem.split("-")[1]), p) for p in self.directory.glob("journal-*.log")
+        )
+        for base, path in segments:
+            if base < snapshot_lsn:
+                continue                    # already folded into the snapshot
+            lsn = base
+            for payload in read_segment(path):
+                lsn += self._replay(payload)
+        self.recovery = {
+            "snapshot_lsn": snapshot_lsn,
+            "replayed": lsn - snapshot_lsn,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        return lsn
+
+    def close(self):
+        self.journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# 4. LEDGERBANKACCOUNT
+# ============================================================
+
+class LedgerBankAccount(BankAccount):
+    """error_handling_oop.BankAccount's API, backed by a Ledger."""
+
+    def __init__(self, ledger, owner, balance=0, account_id=None):
+        if balance < 0:
+            raise ValueError("Initial balance cannot be negative.")
+        self.ledger = ledger
+        self.owner = owner
+        self.id = account_id if account_id is not None else ledger.open_account(owner, to_cents(balance))
+
+    @property
+    def balance(self):
+        return from_cents(self.ledger.balance(self.id))
+
+    def deposit(self, amount):
+        if amount <= 0:
+            raise NegativeAmountError("Deposit must be positive.")
+        return from_cents(self.ledger.deposit(self.id, to_cents(amount)))
+
+    def withdraw(self, amount):
+        if amount <= 0:
+            raise NegativeAmountError("Withdrawal must be positive.")
+        return from_cents(self.ledger.withdraw(self.id, to_cents(amount)))
+
+    def transfer_to(self, other, amount):
+        self.ledger.transfer(self.id, other.id, to_cents(amount))
+
+
+# ============================================================
+# 5. DEMO
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Same BankAccount flow, now durable")
+    print("# -----------------------------\n")
+
+    with tempfile.TemporaryDirectory(prefix="ledger_") as tmp:
+        with Ledger(tmp) as ledger:
+            alex = LedgerBankAccount(ledger, "Alex", 100)
+            sam = LedgerBankAccount(ledger, "Sam", 0.10)
+            alex.deposit(50)
+            try:
+                alex.withdraw(200)
+            except InsufficientFundsError as e:
+                print("Error:", e)
+            for _ in range(2):
+                sam.deposit(0.10)                 # 0.1 + 0.2 == 0.3 here
+            alex.transfer_to(sam, 25.5)
+            print("Before restart:", alex.balance, sam.balance)
+
+        with Ledger(tmp) as ledger:                # "restart": replay the journal
+            alex = LedgerBankAccount(ledger, "Alex", account_id=alex.id)
+            sam = LedgerBankAccount(ledger, "Sam", account_id=sam.id)
+            print("After restart :", alex.balance, sam.balance, ledger.recovery)
+
+
+# ============================================================
+# 6. BENCHMARK: POSTINGS PER SECOND
+# ============================================================
+
+class NaiveFileAccounts:
+    """Float balances; one write + flush (+ fsync) per posting."""
+
+    def __init__(self, path, fsync):
+        self.balances = {}
+        self.fsync = fsync
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def transfer(self, source, target, amount):
+        with self._lock:
+            if amount > self.balances[source]:
+                raise InsufficientFundsError(source)
+            self.balances[source] -= amount
+            self.balances[target] += amount
+            self._file.write(f"T {source} {target} {amount}\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _hammer(transfer, accounts, threads, per_thread):
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(per_thread):
+            try:
+                transfer(rng.randrange(1, accounts + 1), rng.randrange(1, accounts + 1), rng.randint(1, 500))
+            except InsufficientFundsError:
+                pass
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return threads * per_thread / (time.perf_counter() - start)
+
+
+def benchmark(accounts=1_000_000, threads=16, per_thread=2_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {accounts:,} accounts, {threads} threads, fsync on")
+    print("# -----------------------------\n")
+
+    with tempfile.TemporaryDirectory(prefix="ledger_") as tmp:
+        naive = NaiveFileAccounts(Path(tmp) / "naive.log", fsync=True)
+        naive.balances = dict.fromkeys(range(1, accounts + 1), 1_000.0)
+        rate = _hammer(naive.transfer, accounts, threads, per_thread // 4)
+        naive.close()
+        print(f"float dict + fsync per posting : {rate:12,.0f} postings/s")
+
+        directory = Path(tmp) / "ledger"
+        with Ledger(directory) as ledger:
+            start = time.perf_counter()
+            ledger.open_accounts((f"user-{i}", 100_000) for i in range(accounts))
+            print(f"open {accounts:,} accounts         : {time.perf_counter() - start:8.2f} s")
+
+            commits = ledger.journal.stats["commits"]
+            rate = _hammer(ledger.transfer, accounts, threads, per_thread)
+            batches = ledger.journal.stats["commits"] - commits
+            print(f"Ledger.transfer (group commit) : {rate:12,.0f} postings/s"
+                  f" | {threads * per_thread / batches:.1f} postings per fsync")
+
+            rng = random.Random(1)
+            rows = [(rng.randrange(1, accounts + 1), rng.randrange(1, accounts + 1), rng.randint(1, 500))
+                    for _ in range(200_000)]
+            start = time.perf_counter()
+            ledger.transfer_many(rows)
+            print(f"Ledger.transfer_many           : {len(rows) / (time.perf_counter() - start):12,.0f} postings/s")
+
+            start = time.perf_counter()
+            ledger.snapshot()
+            print(f"snapshot                       : {time.perf_counter() - start:8.2f} s")
+            ledger.transfer_many(rows[:50_000])
+            total = sum(ledger.balances.values())
+
+        with Ledger(directory) as recovered:
+            assert sum(recovered.balances.values()) == total, "money appeared or vanished"
+            print(f"recovery                       : {recovered.recovery}")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
@@ -0,0 +1,341 @@
+# ============================================================
+#     OOP AT SCALE — BATCHED, CONCURRENT NOTIFICATIONS
+# ============================================================
+#
+# Description:
+#   NotificationService.notify_user (solid_principles.py) and
+#   UserNotifierLowCoupling.notify (grasp_principles.py) send one
+#   message synchronously per call. A 500k-user broadcast then takes
+#   500k × (network round trip).
+#
+#   BatchingNotificationService keeps the same DIP shape (it depends
+#   on MessageSender, not on concrete senders) and adds:
+#     - a bounded queue per channel (callers block when it is full)
+#     - a pool of worker threads per channel ("email", "sms", ...)
+#     - batch coalescing for senders that expose send_many()
+#     - per-channel rate limiting (token bucket)
+#     - delivery latency tracking (enqueue → delivered)
+#
+# Contents:
+#   1. Bulk-capable sender interface
+#   2. Token-bucket rate limiter
+#   3. Latency statistics
+#   4. BatchingNotificationService
+#   5. Local stub senders
+#   6. Demo and benchmark
+#
+# ============================================================
+
+import queue
+import threading
+import time
+
+from grasp_principles import UserNotifierLowCoupling
+from solid_principles import MessageSender, NotificationService
+
+
+# ============================================================
+# 1. BULK-CAPABLE SENDER INTERFACE
+# ============================================================
+
+class BulkMessageSender(MessageSender):
+    """A sender whose backend accepts many messages in one call."""
+
+    def send_many(self, messages):
+        # messages: list of (to, message)
+        raise NotImplementedError
+
+
+def supports_bulk(sender):
+    return callable(getattr(sender, "send_many", None))
+
+
+# ============================================================
+# 2. TOKEN-BUCKET RATE LIMITER
+# ============================================================
+
+class RateLimiter:
+    """Allows `rate` messages per second with bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1):
+        # A batch larger than the bucket is split into bucket-sized bites.
+        while n > 0:
+            take = min(n, self.capacity)
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= take:
+                    self._tokens -= take
+                    n -= take
+                    continue
+                wait = (take - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# ============================================================
+# 3. LATENCY STATISTICS
+# ============================================================
+
+class LatencyStats:
+    def __init__(self):
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def record_many(self, latencies):
+        with self._lock:
+            self._samples.extend(latencies)
+
+    def summary(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0}
+
+        def pct(p):
+            return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+        return {
+            "count": len(samples),
+            "p50_ms": round(pct(50) * 1000, 2),
+            "p99_ms": round(pct(99) * 1000, 2),
+            "max_ms": round(samples[-1] * 1000, 2),
+        }
+
+
+# ============================================================
+# 4. BATCHINGNOTIFICATIONSERVICE
+# ============================================================
+
+_STOP = object()
+
+
+class _Channel:
+    def __init__(self, name, sender, *, workers, queue_size, batch_size, max_wait, rate):
+        self.name = name
+        self.sender = sender
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size if supports_bulk(sender) else 1
+        self.max_wait = max_wait
+        self.limiter = RateLimiter(rate) if rate else None
+        self.latency = LatencyStats()
+        self.errors = 0
+        self._errors_lock = threading.Lock()
+        self.threads = [
+            threading.Thread(target=self._run, name=f"notify-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _next_batch(self):
+        first = self.queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=max(timeout, 0)) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.put(item)      # leave it for this worker's next get()
+                self.queue.task_done()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                self.queue.task_done()
+                return
+            try:
+                if self.limiter:
+                    self.limiter.acquire(len(batch))
+                messages = [(to, text) for to, text, _ in batch]
+                if self.batch_size > 1:
+                    self.sender.send_many(messages)
+                else:
+                    for to, text in messages:
+                        self.sender.send(to, text)
+                done = time.monotonic()
+                self.latency.record_many([done - queued for _, _, queued in batch])
+            except Exception:
+                with self._errors_lock:
+                    self.errors += len(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+
+class BatchingNotificationService(NotificationService):
+    """Queued, batched, rate-limited drop-in for NotificationService.
+
+    Example:
+        service = BatchingNotificationService(
+            {"email": EmailSender(), "sms": SmsSender()},
+            rate_limits={"sms": 50},
+        )
+        service.notify_user("user@example.com", "Welcome!")
+        service.notify_user("+123456789", "Code 1234", channel="sms")
+        service.close()
+    """
+
+    def __init__(self, senders, *, default_channel=None, workers=4, queue_size=10_000,
+                 batch_size=100, max_wait=0.01, rate_limits=None):
+        if isinstance(senders, MessageSender):
+            senders = {"default": senders}
+        self.default_channel = default_channel or next(iter(senders))
+        super().__init__(senders[self.default_channel])
+        rate_limits = rate_limits or {}
+        self.channels = {
+            name: _Channel(
+                name, sender,
+                workers=workers, queue_size=queue_size, batch_size=batch_size,
+                max_wait=max_wait, rate=rate_limits.get(name),
+            )
+            for name, sender in senders.items()
+        }
+        self._closed = False
+
+    def notify_user(self, user_contact, text, channel=None):
+        if self._closed:
+            raise RuntimeError("NotificationService is closed")
+        # Blocks when the queue is full → natural backpressure on producers.
+        self.channels[channel or self.default_channel].queue.put(
+            (user_contact, text, time.monotonic())
+        )
+
+    # Same signature as EmailService.send, so this service can be injected
+    # into grasp_principles.UserNotifierLowCoupling unchanged.
+    def send(self, to, message):
+        self.notify_user(to, message)
+
+    def flush(self):
+        """Block until everything queued so far has been delivered."""
+        for channel in self.channels.values():
+            channel.queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        for channel in self.channels.values():
+            for _ in channel.threads:
+                channel.queue.put(_STOP)
+            for thread in channel.threads:
+                thread.join()
+
+    def stats(self):
+        return {
+            name: {**channel.latency.summary(), "errors": channel.errors,
+                   "queued": channel.queue.qsize()}
+            for name, channel in self.channels.items()
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# 5. LOCAL STUB SENDERS
+# ============================================================
+#
+# They simulate a network: each CALL costs `call_latency` seconds
+# (plus a small per-message cost for bulk calls) and they remember
+# what they "sent" so the demo can verify delivery.
+
+class StubSender(MessageSender):
+    def __init__(self, call_latency=0.001):
+        self.call_latency = call_latency
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, to, message):
+        time.sleep(self.call_latency)
+        with self._lock:
+            self.sent.append((to, message))
+
+
+class StubBulkSender(StubSender, BulkMessageSender):
+    def __init__(self, call_latency=0.001, per_message=0.00001):
+        super().__init__(call_latency)
+        self.per_message = per_message
+        self.calls = 0
+
+    def send_many(self, messages):
+        time.sleep(self.call_latency + self.per_message * len(messages))
+        with self._lock:
+            self.sent.extend(messages)
+            self.calls += 1
+
+
+# ============================================================
+# 6. DEMO AND BENCHMARK
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Batched notifications demo")
+    print("# -----------------------------\n")
+
+    email, sms = StubBulkSender(), StubSender()
+    with BatchingNotificationService({"email": email, "sms": sms}, rate_limits={"sms": 200}) as service:
+        for i in range(250):
+            service.notify_user(f"user{i}@example.com", "Welcome!")
+        for i in range(50):
+            service.notify_user(f"+1555000{i:04d}", "Your code is 1234.", channel="sms")
+
+        # Plugs into the GRASP Low Coupling example as its "email service".
+        UserNotifierLowCoupling(service).notify("alex@example.com", "Your order shipped!")
+        service.flush()
+        print("Stats:", service.stats())
+
+    print(f"Email: {len(email.sent)} messages in {email.calls} bulk calls")
+    print(f"SMS:   {len(sms.sent)} messages (no bulk API → one call each)")
+
+
+def benchmark(n=5_000, call_latency=0.001):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: broadcast to {n:,} users, {call_latency * 1000:.0f} ms per send call")
+    print("# -----------------------------\n")
+
+    sync_sender = StubSender(call_latency)
+    service = NotificationService(sync_sender)
+    start = time.perf_counter()
+    for i in range(n):
+        service.notify_user(f"user{i}", "Sale starts now!")
+    sync_time = time.perf_counter() - start
+    print(f"NotificationService (sync)       : {sync_time:6.2f}s → {n / sync_time:10,.0f} msg/s")
+
+    for label, sender in (("pooled, no bulk API", StubSender(call_latency)),
+                          ("pooled + batched", StubBulkSender(call_latency))):
+        start = time.perf_counter()
+        with BatchingNotificationService(sender, workers=8) as batched:
+            for i in range(n):
+                batched.notify_user(f"user{i}", "Sale starts now!")
+            batched.flush()
+            elapsed = time.perf_counter() - start
+            stats = batched.stats()["default"]
+        print(f"BatchingNotificationService {label:20}: {elapsed:6.2f}s → {n / elapsed:10,.0f} msg/s"
+              f" | p99 latency {stats['p99_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
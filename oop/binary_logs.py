@@ -0,0 +1,434 @@
+# ============================================================
+#     OOP AT SCALE — COMPACT BINARY LOGS AND A QUERY TOOL
+# ============================================================
+#
+# Description:
+#   Text logs are expensive twice: formatting/writing every line, and
+#   later grepping through all of them. BinaryLogEncoder is an optional
+#   encoder for AsyncFileLogger (async_file_logger.py) that:
+#     - interns repeated strings (message templates, field names):
+#       each is written ONCE per file, then referenced by a small id
+#     - stores arguments as typed values (ints as zigzag varints,
+#       floats as 8 bytes, strings length-prefixed)
+#     - stores timestamps as varint deltas from the block start
+#     - writes one block per batch, with a header that doubles as a
+#       per-block index: time range + which levels occur
+#
+#   BinaryLogReader streams blocks, skips the ones outside the time
+#   range / level filter without decoding their records, and renders
+#   the rest to text.
+#
+# Contents:
+#   1. Varints and typed values
+#   2. File and block layout
+#   3. BinaryLogEncoder
+#   4. BinaryLogReader (query + render)
+#   5. Size and query-time comparison with JSON Lines
+#   6. Command-line query tool
+#
+# Usage:
+#   python3 oop/binary_logs.py                        # comparison benchmark
+#   python3 oop/binary_logs.py query app.blog --level WARNING \
+#       --since 2026-10-19T10:00:00 --until 2026-10-19T11:00:00
+#
+# ============================================================
+
+import argparse
+import datetime as dt
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from pathlib import Path
+
+from async_file_logger import (
+    AsyncFileLogger, ERROR, INFO, LEVEL_NAMES, LEVELS, WARNING, render,
+)
+
+
+# ============================================================
+# 1. VARINTS AND TYPED VALUES
+# ============================================================
+#
+# A varint stores 7 bits per byte; small numbers take 1 byte. Signed
+# ints are "zigzag" mapped first (0, -1, 1, -2 → 0, 1, 2, 3) so small
+# negative numbers stay small too.
+
+def write_varint(buf, n):
+    while n > 0x7F:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def read_varint(data, pos):
+    shift = result = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def zigzag(n):
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+
+def unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR = range(6)
+_DOUBLE = struct.Struct("<d")
+
+
+def write_value(buf, value):
+    if value is None:
+        buf.append(T_NONE)
+    elif value is True or value is False:
+        buf.append(T_TRUE if value else T_FALSE)
+    elif isinstance(value, int):
+        buf.append(T_INT)
+        write_varint(buf, zigzag(value))
+    elif isinstance(value, float):
+        buf.append(T_FLOAT)
+        buf += _DOUBLE.pack(value)
+    else:
+        raw = (value if isinstance(value, str) else repr(value)).encode("utf-8")
+        buf.append(T_STR)
+        write_varint(buf, len(raw))
+        buf += raw
+
+
+def read_value(data, pos):
+    tag = data[pos]
+    pos += 1
+    if tag == T_NONE:
+        return None, pos
+    if tag == T_FALSE:
+        return False, pos
+    if tag == T_TRUE:
+        return True, pos
+    if tag == T_INT:
+        n, pos = read_varint(data, pos)
+        return unzigzag(n), pos
+    if tag == T_FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+    length, pos = read_varint(data, pos)
+    return bytes(data[pos:pos + length]).decode("utf-8"), pos + length
+
+
+# ============================================================
+# 2. FILE AND BLOCK LAYOUT
+# ============================================================
+#
+#   file   = b"BLOG" version:u8  block*
+#   block  = header  string_defs  records
+#   header = b"BLK1" defs_len:u32 records_len:u32 count:u32
+#            min_ts_ns:u64 max_ts_ns:u64 level_mask:u8
+#   level_mask: one bit per level band: <10, 10-19, 20-29, 30-39,
+#               40-49, 50+ — custom levels get the band they fall in
+#
+#   string_defs: strings first used in this block (ids continue the
+#                file-wide numbering): varint len + utf-8, repeated
+#   record:      varint(ts - min_ts) level:u8 varint(template_id)
+#                varint(n_args) value*  varint(n_fields) (varint(key_id) value)*
+#
+# A reader that skips a block still reads its (small) string_defs so
+# later blocks can resolve their ids. A block cut short at the end of
+# the file (crash mid-write) is treated as the end of the file.
+
+FILE_MAGIC = b"BLOG\x02"
+_BLOCK = struct.Struct("<4sIIIQQB")
+BLOCK_MAGIC = b"BLK1"
+
+_BAND_STARTS = (10, 20, 30, 40, 50)       # DEBUG, INFO, WARNING, ERROR, above
+
+
+def level_bit(level):
+    return 1 << bisect_right(_BAND_STARTS, level)
+
+
+def mask_at_least(min_level):
+    """Bits of every band that can hold a level >= min_level."""
+    if min_level is None:
+        return 0xFF
+    mask = 0
+    for band, end in enumerate(_BAND_STARTS + (float("inf"),)):
+        if end > min_level:
+            mask |= 1 << band
+    return mask
+
+
+# ============================================================
+# 3. BINARYLOGENCODER
+# ============================================================
+
+class BinaryLogEncoder:
+    """Encoder for AsyncFileLogger(path, encoder=BinaryLogEncoder())."""
+
+    def __init__(self):
+        self._strings = {}
+
+    def start_file(self, f):
+        self._strings = {}
+        f.write(FILE_MAGIC)
+
+    def resume(self, path):
+        # Appending to an existing file. A block torn by a crash is cut
+        # off first: new blocks written after it would be unreadable.
+        # Then rebuild the string table from what is left.
+        reader = BinaryLogReader(path)
+        end = reader.complete_size()
+        if os.path.getsize(path) > end:
+            os.truncate(path, end)
+        self._strings = {s: i for i, s in enumerate(reader.strings())}
+
+    @staticmethod
+    def check_level(level):
+        # One byte per record: refuse what would silently wrap.
+        if not 0 <= level <= 0xFF:
+            raise ValueError(f"binary log levels must be 0-255, got {level!r}")
+
+    def _intern(self, text, defs, new):
+        sid = self._strings.get(text)
+        if sid is None:
+            sid = new.get(text)
+        if sid is None:
+            sid = new[text] = len(self._strings) + len(new)
+            raw = text.encode("utf-8")
+            write_varint(defs, len(raw))
+            defs += raw
+        return sid
+
+    def encode(self, records):
+        # Strings first seen here join the table only once the whole
+        # batch has encoded: a failed batch never reaches the file, so
+        # its definitions must not be assumed by later blocks.
+        defs, body, new = bytearray(), bytearray(), {}
+        min_ts = min(r[0] for r in records)
+        max_ts = max(r[0] for r in records)
+        mask = 0
+        for ts_ns, level, template, args, fields in records:
+            self.check_level(level)
+            mask |= level_bit(level)
+            write_varint(body, ts_ns - min_ts)
+            body.append(level)
+            # FileLogger.log accepts any object as the message.
+            write_varint(body, self._intern(str(template), defs, new))
+            write_varint(body, len(args))
+            for arg in args:
+                write_value(body, arg)
+            write_varint(body, len(fields))
+            for key, value in fields.items():
+                write_varint(body, self._intern(str(key), defs, new))
+                write_value(body, value)
+        header = _BLOCK.pack(BLOCK_MAGIC, len(defs), len(body), len(records), min_ts, max_ts, mask)
+        self._strings.update(new)
+        return bytes(header + defs + body)
+
+
+# ============================================================
+# 4. BINARYLOGREADER (QUERY + RENDER)
+# ============================================================
+
+class BinaryLogReader:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.blocks_read = 0
+        self.blocks_skipped = 0
+
+    def _blocks(self):
+        """Yield (header fields, defs bytes, records reader) per block."""
+        with open(self.path, "rb") as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"{self.path} is not a binary log")
+            size = os.fstat(f.fileno()).st_size
+            while True:
+                raw = f.read(_BLOCK.size)
+                if len(raw) < _BLOCK.size:
+                    return                              # end of file (or torn tail)
+                magic, defs_len, rec_len, count, min_ts, max_ts, mask = _BLOCK.unpack(raw)
+                if magic != BLOCK_MAGIC:
+                    raise ValueError("corrupt block header")
+                defs = f.read(defs_len)
+                start = f.tell()
+                if len(defs) < defs_len or start + rec_len > size:
+                    return                              # torn tail: the block is incomplete
+                yield (count, min_ts, max_ts, mask), defs, (f, start, rec_len)
+                f.seek(start + rec_len)
+
+    @staticmethod
+    def _decode_defs(defs):
+        pos, out = 0, []
+        while pos < len(defs):
+            length, pos = read_varint(defs, pos)
+            out.append(defs[pos:pos + length].decode("utf-8"))
+            pos += length
+        return out
+
+    def complete_size(self):
+        """File size up to the end of the last complete block."""
+        end = len(FILE_MAGIC)
+        for _, _, (_, start, rec_len) in self._blocks():
+            end = start + rec_len
+        return end
+
+    def strings(self):
+        table = []
+        for _, defs, _ in self._blocks():
+            table.extend(self._decode_defs(defs))
+        return table
+
+    def query(self, since_ns=None, until_ns=None, min_level=None):
+        """Yield (ts_ns, level, message, fields) matching the filters."""
+        table = []
+        wanted_mask = mask_at_least(min_level)
+        for (count, min_ts, max_ts, mask), defs, (f, start, rec_len) in self._blocks():
+            table.extend(self._decode_defs(defs))
+            if ((since_ns is not None and max_ts < since_ns)
+                    or (until_ns is not None and min_ts > until_ns)
+                    or not mask & wanted_mask):
+                self.blocks_skipped += 1
+                continue
+            self.blocks_read += 1
+            f.seek(start)
+            data = f.read(rec_len)
+            pos = 0
+            for _ in range(count):
+                delta, pos = read_varint(data, pos)
+                level = data[pos]
+                pos += 1
+                template_id, pos = read_varint(data, pos)
+                n_args, pos = read_varint(data, pos)
+                args = []
+                for _ in range(n_args):
+                    value, pos = read_value(data, pos)
+                    args.append(value)
+                n_fields, pos = read_varint(data, pos)
+                fields = {}
+                for _ in range(n_fields):
+                    key_id, pos = read_varint(data, pos)
+                    fields[table[key_id]], pos = read_value(data, pos)
+                ts = min_ts + delta
+                if ((since_ns is not None and ts < since_ns)
+                        or (until_ns is not None and ts > until_ns)
+                        or (min_level is not None and level < min_level)):
+                    continue
+                yield ts, level, render(table[template_id], tuple(args)), fields
+
+
+def format_record(ts_ns, level, message, fields):
+    stamp = dt.datetime.fromtimestamp(ts_ns / 1e9).isoformat(timespec="microseconds")
+    extra = "".join(f" {k}={v}" for k, v in fields.items())
+    return f"{stamp} {LEVEL_NAMES.get(level, level):7} {message}{extra}"
+
+
+# ============================================================
+# 5. SIZE AND QUERY-TIME COMPARISON WITH JSON LINES
+# ============================================================
+
+def query_json_lines(path, since_ns, until_ns, min_level):
+    # What "grep" has to do with the text format: parse every line.
+    since, until = since_ns / 1e9, until_ns / 1e9
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if since <= entry["ts"] <= until and LEVELS[entry["level"]] >= min_level:
+                yield entry
+
+
+def _write_sample(logger, n):
+    for i in range(n):
+        if i % 50 == 0:
+            logger.log("gateway %s timed out after %.1f s", "card", 2.5, level=WARNING, attempt=i % 3)
+        elif i % 997 == 0:
+            logger.log("payment %d failed: %s", i, "insufficient funds", level=ERROR, user_id=i)
+        else:
+            logger.log("payment %d received from %s", i, "alex", level=INFO, amount=99, currency="EUR")
+        if i % 10_000 == 0:
+            time.sleep(0.01)      # spread records over time for range queries
+
+
+def benchmark(n=200_000):
+    print("\n# -----------------------------")
+    print(f"# {n:,} records: JSON Lines vs binary")
+    print("# -----------------------------\n")
+
+    with tempfile.TemporaryDirectory(prefix="binary_logs_") as tmp:
+        text_path, bin_path = Path(tmp) / "app.log", Path(tmp) / "app.blog"
+        big = 1 << 40     # no rotation for the comparison
+        windows = {}
+        for path, encoder in ((text_path, None), (bin_path, BinaryLogEncoder())):
+            first_ns = time.time_ns()
+            with AsyncFileLogger(path, encoder=encoder, max_bytes=big) as logger:
+                _write_sample(logger, n)
+            last_ns = time.time_ns()
+            # Query window: the middle 10% of each run (each run has its own
+            # timeline, so hit counts differ slightly between formats).
+            span = last_ns - first_ns
+            windows[path] = (first_ns + span * 45 // 100, first_ns + span * 55 // 100)
+
+        text_size, bin_size = text_path.stat().st_size, bin_path.stat().st_size
+        print(f"size   : text {text_size / 1e6:7.2f} MB | binary {bin_size / 1e6:7.2f} MB"
+              f" | {text_size / bin_size:.1f}x smaller")
+
+        start = time.perf_counter()
+        text_hits = list(query_json_lines(text_path, *windows[text_path], WARNING))
+        text_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reader = BinaryLogReader(bin_path)
+        bin_hits = list(reader.query(*windows[bin_path], WARNING))
+        bin_time = time.perf_counter() - start
+
+        print("query  : WARNING+ in the middle 10% of the run")
+        print(f"  text   {text_time * 1000:7.1f} ms | {len(text_hits):5} hits | every line parsed")
+        print(f"  binary {bin_time * 1000:7.1f} ms | {len(bin_hits):5} hits |"
+              f" {reader.blocks_read} blocks decoded, {reader.blocks_skipped} skipped")
+        if bin_hits:
+            print("sample :", format_record(*bin_hits[0]))
+
+
+# ============================================================
+# 6. COMMAND-LINE QUERY TOOL
+# ============================================================
+
+def _parse_time(text):
+    if text is None:
+        return None
+    try:
+        return int(float(text) * 1e9)
+    except ValueError:
+        return int(dt.datetime.fromisoformat(text).timestamp() * 1e9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Binary log benchmark and query tool.")
+    sub = parser.add_subparsers(dest="command")
+    query = sub.add_parser("query", help="print matching records as text")
+    query.add_argument("path")
+    query.add_argument("--since", help="ISO time or epoch seconds")
+    query.add_argument("--until", help="ISO time or epoch seconds")
+    query.add_argument("--level", choices=sorted(LEVELS, key=LEVELS.get))
+    args = parser.parse_args(argv)
+
+    if args.command != "query":
+        benchmark()
+        return 0
+
+    reader = BinaryLogReader(args.path)
+    level = LEVELS[args.level] if args.level else None
+    for record in reader.query(_parse_time(args.since), _parse_time(args.until), level):
+        print(format_record(*record))
+    print(f"# blocks decoded: {reader.blocks_read}, skipped: {reader.blocks_skipped}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# ============================================================
+#     OOP AT SCALE — BULK INVOICE RENDERING AND SAVING
+# ============================================================
+#
+# Description:
+#   InvoiceSaver.save_to_file (solid_principles.py) opens one file per
+#   invoice and calls f.write() once per line item; InvoicePrinter
+#   prints line by line. For a month-end batch of millions of invoices
+#   the time goes into open/close/write system calls, not into Python.
+#
+#   The batch path keeps the SRP split (rendering ≠ saving) but:
+#     - renders with a precompiled template (bound str.format methods)
+#     - renders whole chunks of invoices into ONE string per chunk
+#     - spreads chunks over a process pool
+#     - writes everything into a single stream (or a zip archive)
+#       through a large buffer → a handful of big writes
+#     - reports invoices per second
+#
+# Contents:
+#   1. Precompiled template renderer
+#   2. BatchInvoiceRenderer — chunked, parallel rendering
+#   3. BulkInvoiceSaver — single stream or zip archive
+#   4. Benchmark: InvoiceSaver per file vs bulk pipeline
+#
+# ============================================================
+
+import os
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from solid_principles import Invoice, InvoiceSaver
+
+
+# ============================================================
+# 1. PRECOMPILED TEMPLATE RENDERER
+# ============================================================
+#
+# Looking up "...".format on every line is avoided by binding the
+# methods once. The output matches InvoiceSaver byte for byte.
+
+_LINE = "{}: {:.2f}\n".format
+_TOTAL = "TOTAL: {:.2f}\n".format
+
+
+def render_invoice(items, total):
+    return "".join([_LINE(name, price) for name, price in items]) + _TOTAL(total)
+
+
+def render_chunk(chunk):
+    """Render [(invoice_no, items, total), ...] as (count, one string) (runs in a worker)."""
+    parts = []
+    for number, items, total in chunk:
+        parts.append(f"=== INVOICE {number} ===\n")
+        parts.append(render_invoice(items, total))
+    return len(chunk), "".join(parts)
+
+
+def render_members(chunk):
+    """Render a chunk as (member_name, bytes) pairs for an archive."""
+    return [
+        (f"invoice_{number:08d}.txt", render_invoice(items, total).encode("utf-8"))
+        for number, items, total in chunk
+    ]
+
+
+# ============================================================
+# 2. BATCHINVOICERENDERER — CHUNKED, PARALLEL RENDERING
+# ============================================================
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class BatchInvoiceRenderer:
+    """Turns a stream of invoices into rendered chunks, in order."""
+
+    def __init__(self, chunk_size=2_000, workers=None, in_flight=None):
+        self.chunk_size = chunk_size
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        # Chunks submitted but not yet written. Executor.map() would submit
+        # the WHOLE input up front and hold every chunk in memory.
+        self.in_flight = in_flight or 2 * self.workers
+
+    def _payloads(self, invoices):
+        # Only plain data crosses the process boundary; total() is asked
+        # here, once per invoice (O(1) for RunningInvoice).
+        for number, invoice in enumerate(invoices, start=1):
+            yield number, list(invoice.items), invoice.total()
+
+    def render(self, invoices, renderer=render_chunk):
+        chunks = _chunks(self._payloads(invoices), self.chunk_size)
+        if self.workers <= 1:
+            yield from map(renderer, chunks)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # A FIFO of futures keeps the output order stable.
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(renderer, chunk))
+                if len(pending) >= self.in_flight:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+# ============================================================
+# 3. BULKINVOICESAVER — SINGLE STREAM OR ZIP ARCHIVE
+# ============================================================
+
+class BulkInvoiceSaver:
+    """Saves many invoices with few, large writes."""
+
+    def __init__(self, renderer=None, buffer_size=1 << 20):
+        self.renderer = renderer or BatchInvoiceRenderer()
+        self.buffer_size = buffer_size
+
+    def save_stream(self, invoices, filename):
+        count = 0
+        with open(filename, "w", encoding="utf-8", buffering=self.buffer_size) as f:
+            for rendered_count, rendered in self.renderer.render(invoices):
+                f.write(rendered)
+                count += rendered_count
+        return count
+
+    def save_archive(self, invoices, filename, compression=zipfile.ZIP_STORED):
+        count = 0
+        with zipfile.ZipFile(filename, "w", compression=compression) as archive:
+            for members in self.renderer.render(invoices, renderer=render_members):
+                for name, data in members:
+                    archive.writestr(name, data)
+                count += len(members)
+        return count
+
+
+# ============================================================
+# 4. BENCHMARK: INVOICESAVER PER FILE VS BULK PIPELINE
+# ============================================================
+
+def make_invoices(n):
+    return [
+        Invoice([(f"Item {i % 50}", (i % 997) / 10), ("Shipping", 4.99), ("Gift wrap", 1.5)])
+        for i in range(n)
+    ]
+
+
+def _rate(label, count, seconds):
+    print(f"{label:28} {count:>8,} invoices in {seconds:7.3f}s → {count / seconds:12,.0f} invoices/s")
+
+
+def benchmark(n=20_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: saving {n:,} invoices")
+    print("# -----------------------------\n")
+
+    invoices = make_invoices(n)
+    with tempfile.TemporaryDirectory(prefix="bulk_invoices_") as tmp:
+        tmp = Path(tmp)
+
+        saver = InvoiceSaver()
+        start = time.perf_counter()
+        for i, invoice in enumerate(invoices):
+            saver.save_to_file(invoice, tmp / f"invoice_{i}.txt")
+        _rate("InvoiceSaver (file each)", n, time.perf_counter() - start)
+
+        serial = BulkInvoiceSaver(BatchInvoiceRenderer(workers=1))
+        start = time.perf_counter()
+        count = serial.save_stream(invoices, tmp / "batch_serial.txt")
+        _rate("Bulk stream, 1 process", count, time.perf_counter() - start)
+
+        parallel = BulkInvoiceSaver()
+        start = time.perf_counter()
+        count = parallel.save_stream(invoices, tmp / "batch_parallel.txt")
+        _rate(f"Bulk stream, {parallel.renderer.workers} processes", count, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        count = parallel.save_archive(invoices, tmp / "batch.zip")
+        _rate("Bulk zip archive", count, time.perf_counter() - start)
+
+        # Same bytes as InvoiceSaver for the first invoice:
+        with zipfile.ZipFile(tmp / "batch.zip") as archive:
+            same = archive.read("invoice_00000001.txt") == (tmp / "invoice_0.txt").read_bytes()
+        print("\nArchive member matches InvoiceSaver output:", same)
+
+
+if __name__ == "__main__":
+    benchmark()
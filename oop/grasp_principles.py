@@ -313,20 +313,48 @@ class Storage:
     def save(self, data):
         raise NotImplementedError
 
+    def load(self, key):
+        # Returns the stored value, raises KeyError when it does not exist.
+        raise NotImplementedError
+
+    def load_many(self, keys):
+        # Returns {key: value} for the keys that exist (missing ones are left out).
+        # Backends override this when they can fetch many records in one call.
+        found = {}
+        for key in keys:
+            try:
+                found[key] = self.load(key)
+            except KeyError:
+                pass
+        return found
+
 class FileStorage(Storage):
     def save(self, data):
         print("Saving to file:", data)
 
+    def load(self, key):
+        print("Loading from file:", key)
+        return f"file record {key}"
+
 class DatabaseStorage(Storage):
     def save(self, data):
         print("Saving to database:", data)
 
+    def load(self, key):
+        print("Loading from database:", key)
+        return f"database record {key}"
+
 def save_data(storage: Storage, data):
     storage.save(data)
 
+def load_data(storage: Storage, key):
+    return storage.load(key)
+
 # Demo
 if __name__ == "__main__":
     print("=== PROTECTED VARIATIONS DEMO ===")
     save_data(FileStorage(), "Hello")
     save_data(DatabaseStorage(), "Hello")
+    print(load_data(FileStorage(), 1))
+    print(load_data(DatabaseStorage(), 1))
     print()
@@ -0,0 +1,317 @@
+# ============================================================
+#     OOP AT SCALE — THREAD-SAFE IDs AND CLASS-LEVEL COUNTERS
+# ============================================================
+#
+# Description:
+#   The lessons keep shared counters on the class:
+#     - Ticket.next_id            (oop_basics_lesson3.py, section 7)
+#     - ProgressTracker.attempts  (oop_basics_lesson2.py, section 4)
+#     - QuizQuestion.questions_created (oop_basics_lesson2.py, section 7)
+#   Each one is a read-modify-write on a class attribute. With threads,
+#   two constructors can read the same value: IDs collide and counts
+#   are lost. One global lock fixes that but makes every constructor
+#   wait on every other.
+#
+#   This file provides two small facilities instead:
+#     - BlockAllocator: each thread reserves a block of 1024 IDs under
+#       the lock, then hands them out without locking. IDs are unique,
+#       strictly increasing within a thread, and blocks are reserved in
+#       increasing order. The high-water mark can be persisted BEFORE a
+#       block is used, so IDs never repeat after a restart (a crash just
+#       leaves a gap).
+#     - ShardedCounter: one cell per thread, summed on read.
+#
+# Contents:
+#   1. BlockAllocator
+#   2. ShardedCounter
+#   3. The lesson classes, thread-safe
+#   4. Demo
+#   5. Benchmark at 16 threads
+#
+# ============================================================
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+# ============================================================
+# 1. BLOCKALLOCATOR
+# ============================================================
+
+class BlockAllocator:
+    """Unique integer IDs with one lock acquisition per block, not per ID."""
+
+    def __init__(self, start=1, block_size=1024, state_path=None, fsync=False):
+        self.block_size = block_size
+        self.state_path = Path(state_path) if state_path else None
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_block = max(start, self._read_high_water_mark())
+        self.blocks_reserved = 0
+
+    def _read_high_water_mark(self):
+        if self.state_path is None or not self.state_path.exists():
+            return 0
+        return int(self.state_path.read_text(encoding="ascii").strip() or 0)
+
+    def _write_high_water_mark(self, value):
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp, "w", encoding="ascii") as f:
+            f.write(str(value))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)    # readers see the old or new value, never half
+
+    def _reserve(self):
+        with self._lock:
+            low = self._next_block
+            high = low + self.block_size
+            if self.state_path is not None:
+                self._write_high_water_mark(high)   # persist first, then hand out
+            self._next_block = high
+            self.blocks_reserved += 1
+        return range(low, high)
+
+    def next(self):
+        local = self._local
+        try:
+            return next(local.ids)
+        except (AttributeError, StopIteration):     # first call on this thread, or block used up
+            local.ids = iter(self._reserve())
+            return next(local.ids)
+
+    __next__ = next
+
+    def __iter__(self):
+        return self
+
+    def high_water_mark(self):
+        with self._lock:
+            return self._next_block
+
+
+# ============================================================
+# 2. SHARDEDCOUNTER
+# ============================================================
+#
+# Each thread only ever writes its own cell, so increments need no
+# lock. Reading sums the cells: the total can be a moment behind
+# threads that are still counting, but no increment is ever lost.
+
+class ShardedCounter:
+    def __init__(self, initial=0):
+        self._initial = initial
+        self._cells = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add(self, amount=1):
+        try:
+            self._local.cell[0] += amount
+        except AttributeError:
+            cell = self._local.cell = [amount]
+            with self._lock:
+                self._cells.append(cell)
+
+    @property
+    def value(self):
+        with self._lock:
+            cells = list(self._cells)
+        return self._initial + sum(cell[0] for cell in cells)
+
+    def __int__(self):
+        return self.value
+
+    def __repr__(self):
+        return f"ShardedCounter({self.value})"
+
+
+# ============================================================
+# 3. THE LESSON CLASSES, THREAD-SAFE
+# ============================================================
+#
+# Ticket itself lives in indexed_ticket_board.py and takes its IDs from
+# a class-level BlockAllocator. The lesson 2 classes are repeated here
+# (that file runs its demos at import time) with sharded counters.
+
+class ProgressTracker:
+    attempts = ShardedCounter()
+
+    def __init__(self, student):
+        self.student = student
+        self.completed_modules = 0
+
+    def mark_complete(self):
+        self.completed_modules += 1
+        ProgressTracker.attempts.add()
+
+    @classmethod
+    def total_attempts(cls):
+        return cls.attempts.value
+
+
+class QuizQuestion:
+    questions_created = ShardedCounter()
+
+    def __init__(self, prompt, answer, difficulty="easy"):
+        self.prompt = prompt
+        self._answer = answer
+        self.difficulty = difficulty
+        QuizQuestion.questions_created.add()
+
+    @classmethod
+    def created_count(cls):
+        return cls.questions_created.value
+
+
+# ============================================================
+# 4. DEMO
+# ============================================================
+
+def demo():
+    from indexed_ticket_board import Ticket
+
+    print("\n# -----------------------------")
+    print("# Tickets created from 8 threads")
+    print("# -----------------------------\n")
+
+    made = []
+
+    def worker():
+        made.extend(Ticket(f"t{i}") for i in range(5_000))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ids = [t.id for t in made]
+    print(f"{len(ids):,} tickets, {len(set(ids)):,} unique ids, "
+          f"{Ticket.ids.blocks_reserved} blocks reserved")
+
+    print("\n# -----------------------------")
+    print("# High-water mark survives a restart")
+    print("# -----------------------------\n")
+
+    with tempfile.TemporaryDirectory(prefix="ids_") as tmp:
+        state = Path(tmp) / "ticket_ids.hwm"
+        first_run = BlockAllocator(state_path=state)
+        used = [first_run.next() for _ in range(10)]
+        second_run = BlockAllocator(state_path=state)   # "restart"
+        print(f"run 1 issued {used[0]}..{used[-1]}; run 2 starts at {second_run.next()}"
+              f" (stored mark {state.read_text()})")
+
+    tracker = ProgressTracker("Alex")
+    tracker.mark_complete()
+    tracker.mark_complete()
+    QuizQuestion("What does OOP stand for?", "Object-Oriented Programming")
+    print("\nattempts:", ProgressTracker.total_attempts(),
+          "| questions:", QuizQuestion.created_count())
+
+
+# ============================================================
+# 5. BENCHMARK AT 16 THREADS
+# ============================================================
+
+class NaiveIds:
+    """The lesson's pattern: read the class attribute, then bump it."""
+
+    next_id = 1
+
+    def next(self):
+        value = NaiveIds.next_id
+        NaiveIds.next_id += 1
+        return value
+
+
+# CPython's GIL only switches threads at calls and loop back-edges, so
+# the two bare lines above are rarely interrupted on a standard build.
+# Any call between the read and the write (validation, logging, a
+# property) opens the window — as does a free-threaded build.
+
+class NaiveIdsWithWork:
+    next_id = 1
+
+    def next(self):
+        value = NaiveIdsWithWork.next_id
+        self._validate(value)
+        NaiveIdsWithWork.next_id = value + 1
+        return value
+
+    def _validate(self, value):
+        return value > 0
+
+
+class LockedIds:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = 1
+
+    def next(self):
+        with self._lock:
+            value = self._next
+            self._next += 1
+            return value
+
+
+def _run_threads(take, threads, per_thread):
+    results = [None] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(slot):
+        barrier.wait()
+        results[slot] = [take() for _ in range(per_thread)]
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, results
+
+
+def benchmark(threads=16, per_thread=100_000):
+    total = threads * per_thread
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {threads} threads x {per_thread:,} ids")
+    print("# -----------------------------\n")
+
+    # A short switch interval makes the naive race show up quickly.
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with tempfile.TemporaryDirectory(prefix="ids_") as tmp:
+            candidates = [
+                ("class attribute (lesson)", NaiveIds()),
+                ("class attribute + a call", NaiveIdsWithWork()),
+                ("one global lock", LockedIds()),
+                ("BlockAllocator(1024)", BlockAllocator()),
+                ("BlockAllocator + persisted", BlockAllocator(state_path=Path(tmp) / "hwm")),
+            ]
+            for label, allocator in candidates:
+                elapsed, results = _run_threads(allocator.next, threads, per_thread)
+                ids = [i for chunk in results for i in chunk]
+                monotonic = all(all(a < b for a, b in zip(c, c[1:])) for c in results)
+                print(f"{label:28}: {total / elapsed:12,.0f} ids/s | duplicates "
+                      f"{total - len(set(ids)):7,} | per-thread monotonic {monotonic}")
+
+        counter = ShardedCounter()
+        elapsed, _ = _run_threads(counter.add, threads, per_thread)
+        print(f"{'ShardedCounter.add':28}: {total / elapsed:12,.0f} adds/s | value {counter.value:,}"
+              f" (expected {total:,})")
+    finally:
+        sys.setswitchinterval(old_interval)
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
@@ -0,0 +1,468 @@
+# ============================================================
+#     OOP AT SCALE — INDEXED TicketBoard
+# ============================================================
+#
+# Description:
+#   The capstone TicketBoard in oop_basics_lesson3.py (section 7)
+#   keeps tickets in a list: finding a ticket by id, resolving the
+#   high-severity ones and printing a summary all walk every ticket.
+#   With millions of tickets each of those is O(n).
+#
+#   IndexedTicketBoard maintains secondary indexes on every change:
+#     - by id        → O(1) get()
+#     - by severity  → resolve_high_priority() touches only open
+#                      high tickets
+#     - by status    → open / resolved sets
+#     - counters per (severity, status) → O(1) count()
+#     - summary() reports the counters plus only the tickets that
+#       changed since the previous summary, never the whole board
+#
+#   Tickets notify the board when they are resolved, so the indexes
+#   stay correct even if code calls ticket.resolve() directly.
+#
+#   The board is also a work queue: a binary heap ordered by
+#   (priority, age) gives O(log n) pop_next(), drain(k) for the top-k,
+#   and in-place priority changes. Priority comes from
+#   ticket.priority(), so subclasses bring their own rules (a blocker
+#   bug jumps the queue; features wait behind other medium work).
+#   Changed or resolved tickets leave stale heap entries behind that
+#   are skipped when popped ("lazy invalidation") instead of searched
+#   for and removed, which would be O(n).
+#
+#   The ticket classes mirror lesson 3 (that file runs its demos at
+#   import time, so they are repeated here to keep this one runnable
+#   on its own).
+#
+# Contents:
+#   1. Tickets that announce their changes
+#   2. IndexedTicketBoard
+#   3. Priority work queue
+#   4. Demo
+#   5. Benchmark at 1M tickets
+#
+# ============================================================
+
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+
+from id_allocation import BlockAllocator
+
+
+# ============================================================
+# 1. TICKETS THAT ANNOUNCE THEIR CHANGES
+# ============================================================
+
+SEVERITIES = ("low", "medium", "high")
+STATUSES = ("open", "resolved")
+SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}     # lower = served first
+
+
+class Ticket:
+    ids = BlockAllocator()      # thread-safe replacement for next_id (see id_allocation.py)
+    # Ids come from per-thread blocks, so they are NOT in creation order
+    # across threads; this single counter is (next() on it is atomic).
+    _created = itertools.count()
+
+    def __init__(self, title, severity="low"):
+        if severity not in SEVERITIES:
+            raise ValueError(f"severity must be one of {SEVERITIES}")
+        self.id = Ticket.ids.next()
+        self.created = next(Ticket._created)
+        self.title = title
+        self._severity = severity
+        self._resolved = False
+        self._listeners = []
+
+    def _notify(self, field, old, new):
+        for listener in self._listeners:
+            listener(self, field, old, new)
+
+    def resolve(self, announce=True):
+        if self._resolved:
+            return
+        self._resolved = True
+        if announce:
+            print(f"Ticket #{self.id} resolved.")
+        self._notify("status", "open", "resolved")
+
+    # severity and status are read-only: a plain assignment would skip
+    # _notify() and leave every board index built on them stale.
+
+    @property
+    def severity(self):
+        return self._severity
+
+    @severity.setter
+    def severity(self, value):
+        raise AttributeError("severity is read-only; use change_severity()")
+
+    def change_severity(self, severity):
+        if severity not in SEVERITIES:
+            raise ValueError(f"severity must be one of {SEVERITIES}")
+        old, self._severity = self._severity, severity
+        if old != severity:
+            self._notify("severity", old, severity)
+
+    def _status(self):
+        return "resolved" if self._resolved else "open"
+
+    # Still called as ticket.status(), like lesson 3; the property only
+    # stops `ticket.status = ...` from replacing the method.
+    status = property(lambda self: self._status, doc="ticket.status() → 'open' or 'resolved'")
+
+    def priority(self):
+        # Override in subclasses; any value that sorts works.
+        return SEVERITY_RANK[self.severity]
+
+    def __repr__(self):
+        return f"Ticket(id={self.id}, title={self.title!r}, severity={self.severity!r})"
+
+
+class BugTicket(Ticket):
+    def __init__(self, title, steps, blocker=False):
+        super().__init__(title, severity="high")
+        self.steps = steps
+        self.blocker = blocker
+
+    def priority(self):
+        return -1 if self.blocker else super().priority()
+
+    def details(self):
+        return f"Bug: {self.title}\nSteps: {self.steps}"
+
+
+class FeatureTicket(Ticket):
+    def __init__(self, title, impact):
+        super().__init__(title, severity="medium")
+        self.impact = impact
+
+    def priority(self):
+        return super().priority() + 0.5         # after other tickets of equal severity
+
+    def details(self):
+        return f"Feature: {self.title}\nImpact: {self.impact}"
+
+
+# ============================================================
+# 2. INDEXEDTICKETBOARD
+# ============================================================
+#
+# Dicts are used as ordered sets (id -> ticket): O(1) add/remove and
+# iteration in insertion order, like the original list.
+
+class IndexedTicketBoard:
+    """Same API as lesson 3's TicketBoard, with O(1) lookups and counts."""
+
+    def __init__(self, announce=True):
+        self.announce = announce
+        self._by_id = {}
+        self._by_severity = {s: {} for s in SEVERITIES}
+        self._by_status = {s: {} for s in STATUSES}
+        self._open_by_severity = {s: {} for s in SEVERITIES}
+        self._counts = Counter()            # (severity, status) -> n
+        self._changed = {}                  # tickets touched since last summary()
+        self._heap = []                     # (priority, created, id, version)
+        self._queued = {}                   # id -> version of its live heap entry
+        self._versions = 0
+
+    # -------- writes --------
+
+    def add_ticket(self, ticket):
+        if not isinstance(ticket, Ticket):
+            raise TypeError("Only Ticket instances are allowed")
+        if ticket.id in self._by_id:
+            raise ValueError(f"Ticket #{ticket.id} is already on the board")
+        status = ticket.status()
+        self._by_id[ticket.id] = ticket
+        self._by_severity[ticket.severity][ticket.id] = ticket
+        self._by_status[status][ticket.id] = ticket
+        if status == "open":
+            self._open_by_severity[ticket.severity][ticket.id] = ticket
+        self._counts[ticket.severity, status] += 1
+        self._changed[ticket.id] = ticket
+        if status == "open":
+            self._enqueue(ticket)
+        ticket._listeners.append(self._on_change)
+        if self.announce:
+            print(f"Added ticket #{ticket.id}: {ticket.title}")
+
+    def _on_change(self, ticket, field, old, new):
+        if field == "status":
+            self._move_status(ticket, old, new)
+        elif field == "severity":
+            self._move_severity(ticket, old, new)
+        self._changed[ticket.id] = ticket
+
+    def _move_status(self, ticket, old, new):
+        del self._by_status[old][ticket.id]
+        self._by_status[new][ticket.id] = ticket
+        if old == "open":
+            del self._open_by_severity[ticket.severity][ticket.id]
+        if new == "open":
+            self._open_by_severity[ticket.severity][ticket.id] = ticket
+        self._counts[ticket.severity, old] -= 1
+        self._counts[ticket.severity, new] += 1
+        if new == "open":
+            self._enqueue(ticket)
+        elif self._queued.pop(ticket.id, None) is not None:
+            self._maybe_compact()                  # its heap entry went stale
+
+    def _move_severity(self, ticket, old, new):
+        status = ticket.status()
+        del self._by_severity[old][ticket.id]
+        self._by_severity[new][ticket.id] = ticket
+        if status == "open":
+            del self._open_by_severity[old][ticket.id]
+            self._open_by_severity[new][ticket.id] = ticket
+        self._counts[old, status] -= 1
+        self._counts[new, status] += 1
+        if ticket.id in self._queued:
+            self._enqueue(ticket)
+
+    def resolve(self, ticket_id):
+        self._by_id[ticket_id].resolve(announce=self.announce)
+
+    def resolve_high_priority(self):
+        # Only the open high tickets, most urgent first: O(k log k).
+        urgent = sorted(self._open_by_severity["high"].values(), key=self._sort_key)
+        for ticket in urgent:
+            ticket.resolve(announce=self.announce)
+
+    # -------- reads --------
+
+    def get(self, ticket_id):
+        return self._by_id[ticket_id]
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, ticket_id):
+        return ticket_id in self._by_id
+
+    def by_severity(self, severity):
+        return list(self._by_severity[severity].values())
+
+    def by_status(self, status):
+        return list(self._by_status[status].values())
+
+    def count(self, severity=None, status=None):
+        if severity is not None and status is not None:
+            return self._counts[severity, status]
+        if severity is not None:
+            return len(self._by_severity[severity])
+        if status is not None:
+            return len(self._by_status[status])
+        return len(self._by_id)
+
+    def summary(self, show_changes=True):
+        """Print counters and the tickets changed since the last summary.
+
+        Cost: O(severities × statuses + changed tickets), not O(board).
+        """
+        for severity in SEVERITIES:
+            cells = "  ".join(f"{status}={self._counts[severity, status]}" for status in STATUSES)
+            print(f"[{severity:>6}] {cells}")
+        if show_changes:
+            for ticket in self._changed.values():
+                print(f"  changed: #{ticket.id} [{ticket.severity}] {ticket.title}"
+                      f" → {ticket.status()}")
+        changed = len(self._changed)
+        self._changed = {}
+        return changed
+
+    # ============================================================
+    # 3. PRIORITY WORK QUEUE
+    # ============================================================
+    #
+    # Entries are (priority, creation order, ticket id, version), so ties
+    # on priority go to the oldest ticket. Not the id: a thread working
+    # through an early ID block hands out low ids long after other
+    # threads have moved on. Each (re)queue gets a new version; an entry
+    # whose version is no longer the one in _queued is stale and is
+    # dropped when it reaches the top.
+
+    @staticmethod
+    def _sort_key(ticket):
+        return ticket.priority(), ticket.created
+
+    def _enqueue(self, ticket):
+        self._versions += 1
+        self._queued[ticket.id] = self._versions
+        heapq.heappush(self._heap, (ticket.priority(), ticket.created, ticket.id, self._versions))
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        # Called wherever entries go stale (requeue, resolve, pop): when
+        # more than half the heap is stale, rebuild it from the live
+        # entries in O(n) — amortized O(1) per stale entry.
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._queued):
+            self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._queued.get(entry[2]) == entry[3]]
+        heapq.heapify(self._heap)
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and self._queued.get(heap[0][2]) != heap[0][3]:
+            heapq.heappop(heap)
+
+    def reprioritize(self, ticket_id):
+        """Re-read ticket.priority() after a subclass-specific change."""
+        ticket = self._by_id[ticket_id]
+        if ticket_id in self._queued:
+            self._enqueue(ticket)
+
+    def peek_next(self):
+        self._discard_stale()
+        return self._by_id[self._heap[0][2]] if self._heap else None
+
+    def pop_next(self):
+        """Take the most urgent open ticket off the queue (it stays open)."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+        _, _, ticket_id, _ = heapq.heappop(self._heap)
+        del self._queued[ticket_id]
+        self._maybe_compact()
+        return self._by_id[ticket_id]
+
+    def requeue(self, ticket_id):
+        ticket = self._by_id[ticket_id]
+        if ticket.status() == "open" and ticket_id not in self._queued:
+            self._enqueue(ticket)
+
+    def drain(self, k):
+        """Pop up to k tickets in priority order: O(k log n)."""
+        taken = []
+        while len(taken) < k and (ticket := self.pop_next()) is not None:
+            taken.append(ticket)
+        return taken
+
+    def queued(self):
+        return len(self._queued)
+
+
+# ============================================================
+# 4. DEMO
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# IndexedTicketBoard demo (same flow as lesson 3)")
+    print("# -----------------------------\n")
+
+    board = IndexedTicketBoard()
+    bug = BugTicket("Crash when saving", steps="Open app → Save → Crash")
+    feature = FeatureTicket("Dark mode", impact="Improves UX at night")
+    board.add_ticket(bug)
+    board.add_ticket(feature)
+    board.summary()
+    board.resolve_high_priority()
+    board.summary()
+    print("Lookup by id:", board.get(feature.id))
+    feature.resolve()                      # direct call: indexes still update
+    print("Resolved count:", board.count(status="resolved"))
+
+    print("\n# -----------------------------")
+    print("# Work queue: severity, age and subclass rules")
+    print("# -----------------------------\n")
+
+    board = IndexedTicketBoard(announce=False)
+    typo = Ticket("Typo on pricing page", "low")
+    export = FeatureTicket("CSV export", impact="Finance asked twice")
+    slow = Ticket("Slow search", "medium")
+    crash = BugTicket("Crash on login", steps="Login → Crash")
+    outage = BugTicket("Payments down", steps="Checkout → 500", blocker=True)
+    for ticket in (typo, export, slow, crash, outage):
+        board.add_ticket(ticket)
+    print("Next up:", board.peek_next().title)
+    typo.change_severity("high")           # in place: queue and indexes follow
+    crash.blocker = True                   # a subclass rule changed...
+    board.reprioritize(crash.id)           # ...so re-read its priority
+    print("Top 3:", [t.title for t in board.drain(3)])
+    print("Rest :", [t.title for t in board.drain(10)])
+
+
+# ============================================================
+# 5. BENCHMARK AT 1M TICKETS
+# ============================================================
+
+class ListTicketBoard:
+    """Lesson 3's list-based board, without the prints."""
+
+    def __init__(self):
+        self._tickets = []
+
+    def add_ticket(self, ticket):
+        self._tickets.append(ticket)
+
+    def get(self, ticket_id):
+        for ticket in self._tickets:
+            if ticket.id == ticket_id:
+                return ticket
+        raise KeyError(ticket_id)
+
+    def resolve_high_priority(self):
+        for ticket in self._tickets:
+            if ticket.severity == "high" and ticket.status() != "resolved":
+                ticket.resolve(announce=False)
+
+    def count(self, severity, status):
+        return sum(1 for t in self._tickets if t.severity == severity and t.status() == status)
+
+
+def _timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    per_call = (time.perf_counter() - start) / repeat
+    print(f"  {label:34} {per_call * 1e3:10.3f} ms")
+    return result
+
+
+def benchmark(n=1_000_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {n:,} tickets")
+    print("# -----------------------------")
+
+    def make():
+        return [Ticket(f"ticket {i}", SEVERITIES[i % 3]) for i in range(n)]
+
+    for label, board in (("list board", ListTicketBoard()),
+                         ("indexed board", IndexedTicketBoard(announce=False))):
+        tickets = make()
+        print(f"\n{label}:")
+        _timed("add all", lambda: [board.add_ticket(t) for t in tickets])
+        last_id = tickets[-1].id
+        _timed("get(last id)", lambda: board.get(last_id), repeat=20)
+        _timed("count(high, open)", lambda: board.count("high", "open"), repeat=5)
+        # A trickle of new high tickets arrives between sweeps.
+        _timed("resolve_high_priority (1st)", board.resolve_high_priority)
+        fresh = [Ticket("fresh", "high") for _ in range(100)]
+        for t in fresh:
+            board.add_ticket(t)
+        _timed("resolve_high_priority (100 new)", board.resolve_high_priority)
+        if isinstance(board, IndexedTicketBoard):
+            _timed("summary() counters only", lambda: board.summary(show_changes=False))
+
+    print("\nwork queue:")
+    board = IndexedTicketBoard(announce=False)
+    tickets = make()
+    for t in tickets:
+        board.add_ticket(t)
+    rng = random.Random(3)
+    ids = [t.id for t in rng.sample(tickets, 10_000)]
+    _timed("pop_next() x 10,000", lambda: [board.pop_next() for _ in range(10_000)])
+    _timed("change_severity() x 10,000",
+           lambda: [board.get(i).change_severity(rng.choice(SEVERITIES)) for i in ids])
+    _timed("drain(1000)", lambda: board.drain(1000))
+    print(f"  heap entries {len(board._heap):,} for {board.queued():,} queued tickets")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
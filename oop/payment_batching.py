@@ -0,0 +1,322 @@
+# ============================================================
+#     OOP AT SCALE — QUEUED, IDEMPOTENT BATCH PAYMENT SETTLEMENT
+# ============================================================
+#
+# Description:
+#   In the Indirection example (grasp_principles.py, section 8)
+#   PaymentProcessor.pay forwards every payment to
+#   PaymentGateway.process, one at a time, synchronously.
+#
+#   QueuedPaymentProcessor keeps the middle-layer role but turns it
+#   into an event-driven pipeline:
+#     - pay() enqueues and returns a Future immediately
+#     - idempotency keys deduplicate retries: the same key always
+#       returns the same Future (and is charged once). Keys are kept
+#       for `key_ttl` seconds, at most `max_keys` of them; a failed
+#       payment's key is released only when it was certainly not charged
+#       (the gateway raised PaymentDeclined); pay() after close() raises
+#     - payments are micro-batched into gateway settlement calls
+#     - each gateway has its own worker pool; the pool size is the
+#       gateway's concurrency limit
+#     - latency (pay → settled) is measured per payment
+#
+# Contents:
+#   1. Payment records and the settlement interface
+#   2. QueuedPaymentProcessor
+#   3. Local stub gateway with configurable latency
+#   4. Demo and benchmark
+#
+# ============================================================
+
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from batched_notifications import LatencyStats
+from grasp_principles import PaymentGateway, PaymentProcessor
+
+
+# ============================================================
+# 1. PAYMENT RECORDS AND THE SETTLEMENT INTERFACE
+# ============================================================
+
+class Payment:
+    __slots__ = ("key", "amount", "queued_at", "future")
+
+    def __init__(self, key, amount):
+        self.key = key
+        self.amount = amount
+        self.queued_at = time.monotonic()
+        self.future = Future()
+
+    def __repr__(self):
+        return f"Payment(key={self.key!r}, amount={self.amount})"
+
+
+class PaymentDeclined(Exception):
+    """Raised by a gateway that certainly did NOT charge the payment."""
+
+
+class SettlementGateway(PaymentGateway):
+    """A gateway that can settle many payments in one call.
+
+    settle() returns one receipt per payment, in the same order, or
+    raises PaymentDeclined when nothing was charged.
+    """
+
+    def settle(self, payments):
+        raise NotImplementedError
+
+
+def settle_with(gateway, payments):
+    """Return one (receipt, error, retryable) triple per payment, in order.
+
+    retryable is True only when the payment was certainly NOT charged:
+    the gateway raised PaymentDeclined. Any other exception (a timeout,
+    a reset connection) may have come after the charge, so it is not.
+    """
+    if callable(getattr(gateway, "settle", None)):
+        try:
+            receipts = list(gateway.settle(payments))
+        except PaymentDeclined as exc:
+            # One settlement call, declined as a whole: nothing charged.
+            return [(None, exc, True)] * len(payments)
+        except Exception as exc:
+            return [(None, exc, False)] * len(payments)
+        if len(receipts) == len(payments):
+            return [(receipt, None, False) for receipt in receipts]
+        # Receipts carry no payment id, so which payments they belong to
+        # is unknown: fail them all, and keep the keys so a retry cannot
+        # charge twice.
+        error = RuntimeError(f"gateway returned {len(receipts)} receipts for {len(payments)} payments")
+        return [(None, error, False)] * len(payments)
+
+    # Plain PaymentGateway objects still work: one process() per payment,
+    # each succeeding or failing on its own.
+    outcomes = []
+    for p in payments:
+        try:
+            outcomes.append((gateway.process(p.amount), None, False))
+        except PaymentDeclined as exc:
+            outcomes.append((None, exc, True))
+        except Exception as exc:
+            outcomes.append((None, exc, False))
+    return outcomes
+
+
+# ============================================================
+# 2. QUEUEDPAYMENTPROCESSOR
+# ============================================================
+
+_STOP = object()
+
+
+class QueuedPaymentProcessor(PaymentProcessor):
+    def __init__(self, gateways, *, concurrency=None, batch_size=50, max_wait=0.005,
+                 queue_size=10_000, key_ttl=24 * 3600, max_keys=100_000):
+        if isinstance(gateways, PaymentGateway):
+            gateways = {"default": gateways}
+        self.gateways = dict(gateways)
+        self.default_gateway = next(iter(self.gateways))
+        super().__init__(self.gateways[self.default_gateway])
+
+        concurrency = concurrency or {}
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queues = {name: queue.Queue(maxsize=queue_size) for name in self.gateways}
+        self.key_ttl = key_ttl
+        self.max_keys = max_keys
+        self._by_key = OrderedDict()        # idempotency key -> (Future, expires_at), oldest first
+        self._lock = threading.Lock()
+        self._closed = False
+        self._auto_keys = itertools.count(1)
+        self.latency = LatencyStats()
+        self.stats = {"accepted": 0, "duplicates": 0, "batches": 0, "failed": 0}
+        self._workers = [
+            threading.Thread(target=self._run, args=(name,), name=f"pay-{name}-{i}", daemon=True)
+            for name in self.gateways
+            for i in range(concurrency.get(name, 4))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    # -------- producer side --------
+
+    def pay(self, amount, idempotency_key=None, gateway=None):
+        key = idempotency_key if idempotency_key is not None else f"auto-{next(self._auto_keys)}"
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("payment processor is closed")
+            self._expire_keys()
+            existing = self._by_key.get(key)
+            if existing is not None:
+                self.stats["duplicates"] += 1
+                return existing[0]
+            payment = Payment(key, amount)
+            self._by_key[key] = (payment.future, payment.queued_at + self.key_ttl)
+            self.stats["accepted"] += 1
+        self._queues[gateway or self.default_gateway].put(payment)
+        return payment.future
+
+    def _expire_keys(self):
+        # Called with the lock held. Keys are in insertion order, so the
+        # expired ones are at the front. A payment still in flight keeps
+        # its key even past the bound: forgetting it would allow a
+        # second charge.
+        now, by_key = time.monotonic(), self._by_key
+        while by_key:
+            future, expires_at = next(iter(by_key.values()))
+            if not future.done() or (expires_at > now and len(by_key) <= self.max_keys):
+                break
+            by_key.popitem(last=False)
+
+    # -------- gateway workers --------
+
+    def _collect(self, q):
+        first = q.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                q.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self, name):
+        gateway, q = self.gateways[name], self._queues[name]
+        while (batch := self._collect(q)) is not None:
+            outcomes = settle_with(gateway, batch)
+            done = time.monotonic()
+            settled = [p for p, (_, error, _) in zip(batch, outcomes) if error is None]
+            with self._lock:
+                self.stats["batches"] += 1
+                for payment, (_, error, retryable) in zip(batch, outcomes):
+                    if error is not None:
+                        self.stats["failed"] += 1
+                        if retryable:
+                            # Not charged: the same key may be tried again.
+                            self._by_key.pop(payment.key, None)
+            self.latency.record_many([done - p.queued_at for p in settled])
+            for payment, (receipt, error, _) in zip(batch, outcomes):
+                if error is None:
+                    payment.future.set_result(receipt)
+                else:
+                    payment.future.set_exception(error)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        for name, q in self._queues.items():
+            for worker in self._workers:
+                if worker.name.startswith(f"pay-{name}-"):
+                    q.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        # A pay() that passed the closed check just before close() may
+        # have queued behind the stop markers: fail it, it was never sent.
+        for q in self._queues.values():
+            while True:
+                try:
+                    payment = q.get_nowait()
+                except queue.Empty:
+                    break
+                if payment is not _STOP:
+                    with self._lock:
+                        self._by_key.pop(payment.key, None)
+                    payment.future.set_exception(RuntimeError("payment processor is closed"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# 3. LOCAL STUB GATEWAY WITH CONFIGURABLE LATENCY
+# ============================================================
+
+class StubGateway(SettlementGateway):
+    def __init__(self, call_latency=0.002, per_payment=0.00002, name="stub"):
+        self.call_latency = call_latency
+        self.per_payment = per_payment
+        self.name = name
+        self.calls = 0
+        self.charged = 0
+        self._lock = threading.Lock()
+
+    def process(self, amount):
+        time.sleep(self.call_latency)
+        with self._lock:
+            self.calls += 1
+            self.charged += 1
+        return f"{self.name}-receipt"
+
+    def settle(self, payments):
+        time.sleep(self.call_latency + self.per_payment * len(payments))
+        with self._lock:
+            self.calls += 1
+            self.charged += len(payments)
+        return [f"{self.name}-{p.key}" for p in payments]
+
+
+# ============================================================
+# 4. DEMO AND BENCHMARK
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Idempotent queued payments")
+    print("# -----------------------------\n")
+
+    card, wallet = StubGateway(name="card"), StubGateway(name="wallet")
+    with QueuedPaymentProcessor({"card": card, "wallet": wallet},
+                                concurrency={"card": 2, "wallet": 1}) as processor:
+        first = processor.pay(99, idempotency_key="order-1")
+        retry = processor.pay(99, idempotency_key="order-1")       # client retry
+        other = processor.pay(15, idempotency_key="order-2", gateway="wallet")
+        print("Retry returns the same future:", first is retry)
+        print("Receipts:", first.result(), other.result())
+    print("Card charged", card.charged, "time(s); stats:", processor.stats)
+
+
+def benchmark(n=5_000, call_latency=0.002):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {n:,} payments, stub gateway {call_latency * 1000:.0f} ms per call")
+    print("# -----------------------------\n")
+
+    sync_gateway = StubGateway(call_latency)
+    sync = PaymentProcessor(sync_gateway)
+    sync_n = n // 10
+    start = time.perf_counter()
+    for _ in range(sync_n):
+        sync.pay(10)
+    elapsed = time.perf_counter() - start
+    print(f"PaymentProcessor (sync) : {sync_n / elapsed:10,.0f} payments/s (measured on {sync_n:,})")
+
+    gateway = StubGateway(call_latency)
+    with QueuedPaymentProcessor(gateway, concurrency={"default": 8}) as processor:
+        start = time.perf_counter()
+        futures = [processor.pay(10, idempotency_key=f"order-{i}") for i in range(n)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+        summary = processor.latency.summary()
+    print(f"QueuedPaymentProcessor  : {n / elapsed:10,.0f} payments/s | p99 {summary['p99_ms']:.1f} ms"
+          f" | {gateway.calls} settlement calls")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
@@ -0,0 +1,303 @@
+# ============================================================
+#     OOP AT SCALE — READ-THROUGH CACHE IN FRONT OF Storage
+# ============================================================
+#
+# Description:
+#   The Storage interface (grasp_principles.py, section 9) now has a
+#   read path: load(key) and load_many(keys). Hot records are still
+#   fetched from the backend on every call.
+#
+#   CachingStorage wraps ANY Storage — FileStorage, DatabaseStorage or
+#   the real backends in storage_backends.py — and adds:
+#     - LRU eviction with a fixed capacity
+#     - TTL per entry (stale entries are reloaded)
+#     - negative caching: "this key does not exist" is cached too,
+#       with its own (usually shorter) TTL
+#     - request coalescing: concurrent misses for one key share a
+#       single backend call ("single flight")
+#     - invalidation on save: the key that was written, or — when the
+#       backend cannot say which key a keyless save created — every
+#       cached "not found"
+#     - hit/miss statistics
+#
+# Contents:
+#   1. CachingStorage
+#   2. Demo over FileStorage and DatabaseStorage
+#   3. Latency benchmark
+#
+# ============================================================
+
+import inspect
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from grasp_principles import DatabaseStorage, FileStorage, Storage, load_data
+from storage_backends import InMemoryStorage
+
+
+# ============================================================
+# 1. CACHINGSTORAGE
+# ============================================================
+
+_MISSING = object()   # cached "not found" marker (see identity lesson: sentinels)
+
+
+class _Flight:
+    """One backend load that several threads are waiting for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = _MISSING
+        self.error = None
+
+
+class CachingStorage(Storage):
+    def __init__(self, inner, *, capacity=10_000, ttl=60.0, negative_ttl=5.0, clock=time.monotonic):
+        self.inner = inner
+        # grasp_principles' FileStorage/DatabaseStorage take save(data) only.
+        self._keyed_saves = "key" in inspect.signature(inner.save).parameters
+        self.capacity = capacity
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self._entries = OrderedDict()   # key -> (value or _MISSING, expires_at)
+        self._flights = {}              # key -> _Flight
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0,
+                      "coalesced": 0, "evictions": 0, "invalidations": 0}
+
+    # -------- cache bookkeeping (call with the lock held) --------
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)           # most recently used
+        return entry
+
+    def _store(self, key, value):
+        ttl = self.negative_ttl if value is _MISSING else self.ttl
+        self._entries[key] = (value, self.clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)    # least recently used
+            self.stats["evictions"] += 1
+
+    # -------- reads --------
+
+    def load(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                if entry[0] is _MISSING:
+                    self.stats["negative_hits"] += 1
+                    raise KeyError(key)
+                self.stats["hits"] += 1
+                return entry[0]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if leader:
+            try:
+                flight.value = self.inner.load(key)
+            except KeyError:
+                flight.value = _MISSING
+            except Exception as exc:          # errors are shared, never cached
+                flight.error = exc
+            with self._lock:
+                if self._flights.get(key) is flight:   # not invalidated meanwhile
+                    if flight.error is None:
+                        self._store(key, flight.value)
+                    del self._flights[key]
+            flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        if flight.value is _MISSING:
+            raise KeyError(key)
+        return flight.value
+
+    def load_many(self, keys):
+        found, missing = {}, []
+        with self._lock:
+            for key in keys:
+                entry = self._lookup(key)
+                if entry is None:
+                    missing.append(key)
+                elif entry[0] is _MISSING:
+                    self.stats["negative_hits"] += 1
+                else:
+                    self.stats["hits"] += 1
+                    found[key] = entry[0]
+            self.stats["misses"] += len(missing)
+
+            # Same guard as load(): a flight per key, so a save() that
+            # runs meanwhile (it pops the flight) keeps stale data out,
+            # and concurrent load() calls wait for this batch.
+            flights = {}
+            for key in missing:
+                if key not in self._flights:
+                    flights[key] = self._flights[key] = _Flight()
+
+        if not missing:
+            return found
+        try:
+            loaded = self.inner.load_many(missing)     # one backend round trip
+        except Exception as exc:
+            self._land(flights, {}, exc)
+            raise
+        self._land(flights, loaded, None)
+        for key in missing:
+            if key in loaded:
+                found[key] = loaded[key]
+        return found
+
+    def _land(self, flights, loaded, error):
+        with self._lock:
+            for key, flight in flights.items():
+                flight.value, flight.error = loaded.get(key, _MISSING), error
+                if self._flights.get(key) is flight:
+                    if error is None:
+                        self._store(key, flight.value)
+                    del self._flights[key]
+        for flight in flights.values():
+            flight.done.set()
+
+    # -------- writes --------
+
+    def save(self, data, key=None):
+        if key is not None and self._keyed_saves:
+            result = self.inner.save(data, key)
+        else:
+            result = self.inner.save(data)
+        written = key if key is not None else result   # keyed backends return the key
+        if written is not None:
+            self.invalidate(written)
+        else:
+            self._invalidate_missing()
+        return result
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            # A load that started before this save must not cache old data.
+            self._flights.pop(key, None)
+            self.stats["invalidations"] += 1
+
+    def _invalidate_missing(self):
+        # Some key we cannot name now exists: forget every cached
+        # "not found" and every load that may have started before.
+        with self._lock:
+            for key in [k for k, (value, _) in self._entries.items() if value is _MISSING]:
+                del self._entries[key]
+            self._flights.clear()
+            self.stats["invalidations"] += 1
+
+    def hit_rate(self):
+        with self._lock:
+            served = self.stats["hits"] + self.stats["negative_hits"] + self.stats["coalesced"]
+            total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+
+# ============================================================
+# 2. DEMO OVER FileStorage AND DatabaseStorage
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Same cache over FileStorage and DatabaseStorage")
+    print("# -----------------------------\n")
+
+    for backend in (FileStorage(), DatabaseStorage()):
+        cache = CachingStorage(backend, capacity=2)
+        for key in (1, 1, 2, 1, 3, 2):       # backend prints only on misses
+            load_data(cache, key)
+        print(f"{type(backend).__name__}: {cache.stats} | hit rate {cache.hit_rate():.0%}\n")
+
+
+# ============================================================
+# 3. LATENCY BENCHMARK
+# ============================================================
+
+class SlowReads(InMemoryStorage):
+    """In-memory data behind a simulated 1 ms database round trip."""
+
+    def __init__(self, latency=0.001):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    def load(self, key):
+        time.sleep(self.latency)
+        self.calls += 1
+        return super().load(key)
+
+    def load_many(self, keys):
+        time.sleep(self.latency)
+        self.calls += 1
+        return super().load_many(keys)
+
+
+def _measure(storage, keys):
+    latencies = []
+    for key in keys:
+        start = time.perf_counter()
+        try:
+            storage.load(key)
+        except KeyError:
+            pass
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def benchmark(n=3_000, records=1_000):
+    print("# -----------------------------")
+    print(f"# Benchmark: {n:,} skewed reads over {records:,} records (+5% unknown keys)")
+    print("# -----------------------------\n")
+
+    backend = SlowReads()
+    backend.save_many([(f"user-{i}", {"id": i}) for i in range(records)], keyed=True)
+    rng = random.Random(7)
+    keys = [
+        f"user-{min(int(rng.paretovariate(1.2)) - 1, records - 1)}" if rng.random() > 0.05
+        else f"ghost-{rng.randrange(20)}"
+        for _ in range(n)
+    ]
+
+    p50, p99 = _measure(backend, keys)
+    print(f"no cache      : p50 {p50 * 1e6:8.1f} us | p99 {p99 * 1e6:8.1f} us | backend calls {backend.calls}")
+
+    backend.calls = 0
+    cache = CachingStorage(backend, capacity=500)
+    p50, p99 = _measure(cache, keys)
+    print(f"with cache    : p50 {p50 * 1e6:8.1f} us | p99 {p99 * 1e6:8.1f} us | backend calls {backend.calls}"
+          f" | hit rate {cache.hit_rate():.1%}")
+
+    # 32 threads asking for the same cold key → one backend call.
+    backend.calls = 0
+    cold = CachingStorage(backend)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(cold.load, ["user-42"] * 32))
+    print(f"coalescing    : 32 concurrent loads → {backend.calls} backend call(s), stats {cold.stats}")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
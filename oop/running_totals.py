@@ -0,0 +1,210 @@
+# ============================================================
+#     OOP AT SCALE — INCREMENTAL RUNNING TOTALS FOR INVOICES
+# ============================================================
+#
+# Description:
+#   Invoice.total() (solid_principles.py) and Order.total()
+#   (grasp_principles.py) re-sum every item on every call, and
+#   InvoicePrinter/InvoiceSaver call total() once more. With 100k line
+#   items queried after every edit, each read costs O(n).
+#
+#   This lesson keeps the aggregate up to date instead:
+#     - items are added, removed and updated through methods
+#     - each method adjusts the running sum, count and tax subtotals
+#     - reads (total, count, tax) become O(1)
+#     - money is stored as integer cents → exact, no float drift
+#
+#   The subclasses still ARE an Invoice / Order (Liskov), so the
+#   existing InvoicePrinter and InvoiceSaver work unchanged.
+#
+# Contents:
+#   1. Exact money: Decimal in, integer cents inside
+#   2. RunningTotalMixin — the incremental aggregate
+#   3. RunningInvoice and RunningOrder
+#   4. Demo with the SRP printer
+#   5. Benchmark: re-sum vs running total
+#
+# ============================================================
+
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from grasp_principles import Order
+from solid_principles import Invoice, InvoicePrinter
+
+
+# ============================================================
+# 1. EXACT MONEY: DECIMAL IN, INTEGER CENTS INSIDE
+# ============================================================
+#
+# Floats cannot represent 0.10 exactly, so summing 100k prices drifts.
+# Converting through str() keeps what the user typed (2.5 → "2.5").
+
+CENT = Decimal("0.01")
+
+
+def to_cents(amount):
+    return int((Decimal(str(amount)) / CENT).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return Decimal(cents) * CENT
+
+
+# ============================================================
+# 2. RUNNINGTOTALMIXIN — THE INCREMENTAL AGGREGATE
+# ============================================================
+
+class RunningTotalMixin:
+    """Keeps sum, count and per-tax-rate subtotals current on every edit.
+
+    Line items live in a dict keyed by a line id, so remove/update are
+    O(1) even when several lines share the same name.
+    """
+
+    def _init_running_total(self, items=()):
+        self._lines = {}            # line_id -> (name, cents, tax_rate)
+        self._next_line_id = 1
+        self._total_cents = 0
+        self._tax_subtotals = {}    # tax_rate -> net cents at that rate
+        for name, price in items:
+            self.add_item(name, price)
+
+    # -------- writes: O(1) each --------
+
+    def add_item(self, name, price, tax_rate=None):
+        line_id = self._next_line_id
+        self._next_line_id += 1
+        cents = to_cents(price)
+        rate = Decimal(str(tax_rate)) if tax_rate is not None else None
+        self._lines[line_id] = (name, cents, rate)
+        self._apply(cents, rate, +1)
+        return line_id
+
+    def remove_item(self, line_id):
+        name, cents, rate = self._lines.pop(line_id)
+        self._apply(cents, rate, -1)
+        return name
+
+    def update_item(self, line_id, *, name=None, price=None, tax_rate=None):
+        old_name, old_cents, old_rate = self._lines[line_id]
+        new_cents = to_cents(price) if price is not None else old_cents
+        new_rate = Decimal(str(tax_rate)) if tax_rate is not None else old_rate
+        self._apply(old_cents, old_rate, -1)
+        self._apply(new_cents, new_rate, +1)
+        self._lines[line_id] = (name if name is not None else old_name, new_cents, new_rate)
+
+    def _apply(self, cents, rate, sign):
+        self._total_cents += sign * cents
+        if rate is not None:
+            remaining = self._tax_subtotals.get(rate, 0) + sign * cents
+            if remaining or sign > 0:
+                self._tax_subtotals[rate] = remaining
+            else:
+                del self._tax_subtotals[rate]
+
+    # -------- reads: O(1) (tax is O(number of distinct rates)) --------
+
+    def total(self):
+        return from_cents(self._total_cents)
+
+    def total_cents(self):
+        return self._total_cents
+
+    def count(self):
+        return len(self._lines)
+
+    def tax_subtotals(self):
+        return {rate: from_cents(cents) for rate, cents in self._tax_subtotals.items()}
+
+    def tax(self):
+        return sum(
+            (from_cents(cents) * rate for rate, cents in self._tax_subtotals.items()),
+            Decimal(0),
+        ).quantize(CENT, ROUND_HALF_UP)
+
+    @property
+    def items(self):
+        # Same (name, price) shape the SRP printer/saver iterate over.
+        return [(name, from_cents(cents)) for name, cents, _ in self._lines.values()]
+
+
+# ============================================================
+# 3. RUNNINGINVOICE AND RUNNINGORDER
+# ============================================================
+#
+# The parent __init__ assigns self.items = items; here `items` is a
+# read-only view, so the mixin initializer replaces that call.
+
+class RunningInvoice(RunningTotalMixin, Invoice):
+    def __init__(self, items=()):
+        self._init_running_total(items)
+
+
+class RunningOrder(RunningTotalMixin, Order):
+    def __init__(self, items=()):
+        self._init_running_total(items)
+
+
+# ============================================================
+# 4. DEMO WITH THE SRP PRINTER
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# RunningInvoice with the SRP printer")
+    print("# -----------------------------\n")
+
+    invoice = RunningInvoice([("Book", 10.0), ("Pen", 2.5)])
+    lamp = invoice.add_item("Lamp", "19.99", tax_rate="0.20")
+    invoice.add_item("Bread", "1.10", tax_rate="0.05")
+    invoice.update_item(lamp, price="17.49")
+    InvoicePrinter().print(invoice)    # unchanged SRP class
+
+    print("Items:", invoice.count())
+    print("Tax subtotals:", invoice.tax_subtotals())
+    print("Tax:", invoice.tax())
+
+    # Float re-sum vs exact cents
+    floats = Invoice([("x", 0.1)] * 10)
+    exact = RunningInvoice([("x", 0.1)] * 10)
+    print("float total:", floats.total(), "| exact total:", exact.total())
+
+    order = RunningOrder([("Shoes", 50), ("Socks", 10)])
+    order.remove_item(2)
+    print("RunningOrder total after removing socks:", order.total())
+
+
+# ============================================================
+# 5. BENCHMARK: RE-SUM VS RUNNING TOTAL
+# ============================================================
+
+def benchmark(n_items=100_000, n_edits=200):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {n_items:,} items, read total after each of {n_edits} edits")
+    print("# -----------------------------\n")
+
+    rows = [(f"item-{i}", (i % 1000) / 100) for i in range(n_items)]
+
+    naive = Invoice(list(rows))
+    start = time.perf_counter()
+    for i in range(n_edits):
+        naive.items[i] = (naive.items[i][0], 9.99)
+        naive.total()
+    naive_time = time.perf_counter() - start
+
+    running = RunningInvoice(rows)
+    start = time.perf_counter()
+    for i in range(n_edits):
+        running.update_item(i + 1, price="9.99")
+        running.total()
+    running_time = time.perf_counter() - start
+
+    print(f"Invoice.total() re-sum : {naive_time * 1000:9.2f} ms")
+    print(f"RunningInvoice.total() : {running_time * 1000:9.2f} ms")
+    print(f"Speed-up               : {naive_time / running_time:9.0f}x")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
@@ -0,0 +1,398 @@
+# ============================================================
+#     OOP AT SCALE — REAL BACKENDS BEHIND THE Storage INTERFACE
+# ============================================================
+#
+# Description:
+#   The Protected Variations example (grasp_principles.py, section 9)
+#   hides the storage choice behind Storage.save(data), but both
+#   implementations only print. This lesson plugs real backends into
+#   the SAME interface, so save_data(storage, data) keeps working:
+#
+#     - InMemoryStorage     → a dict; the speed ceiling
+#     - SegmentedLogStorage → append-only log files, rolled into
+#                             segments, with an in-memory key index
+#     - SQLiteStorage       → SQLite in WAL mode, batched transactions
+#
+#   Every backend adds:
+#     - save(data, key=None) → returns the key (generated if missing)
+#     - save_many(records)   → one bulk write (one transaction/flush)
+#     - load(key)            → the stored value (KeyError if missing)
+#     - load_many(keys)      → {key: value} for the keys that exist
+#     - disk_usage()         → bytes on disk
+#
+#   A common harness measures writes/s, read latency and size.
+#
+# Contents:
+#   1. Shared helpers (keys, encoding)
+#   2. InMemoryStorage
+#   3. SegmentedLogStorage
+#   4. SQLiteStorage
+#   5. Benchmark harness
+#
+# ============================================================
+
+import itertools
+import json
+import os
+import random
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from grasp_principles import Storage, save_data
+
+
+# ============================================================
+# 1. SHARED HELPERS
+# ============================================================
+
+def encode(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def decode(raw):
+    return json.loads(raw)
+
+
+class KeyedStorage(Storage):
+    """Storage with keys, bulk writes and reads.
+
+    save_many() accepts plain values (keys are generated) or
+    (key, value) pairs when `keyed=True`.
+    """
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def _key(self, key):
+        return str(key) if key is not None else f"auto-{next(self._ids)}"
+
+    def _resume_ids(self, existing_keys):
+        # After reopening, generated keys must not collide with stored ones.
+        numbers = [int(k[5:]) for k in existing_keys if k.startswith("auto-") and k[5:].isdigit()]
+        self._ids = itertools.count(max(numbers, default=0) + 1)
+
+    def _pairs(self, records, keyed):
+        if keyed:
+            return [(str(k), v) for k, v in records]
+        return [(self._key(None), v) for v in records]
+
+    def save(self, data, key=None):
+        raise NotImplementedError
+
+    def save_many(self, records, keyed=False):
+        raise NotImplementedError
+
+    def disk_usage(self):
+        return 0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# 2. INMEMORYSTORAGE
+# ============================================================
+
+class InMemoryStorage(KeyedStorage):
+    def __init__(self):
+        super().__init__()
+        self._data = {}
+
+    def save(self, data, key=None):
+        key = self._key(key)
+        self._data[key] = data
+        return key
+
+    def save_many(self, records, keyed=False):
+        pairs = self._pairs(records, keyed)
+        self._data.update(pairs)
+        return [k for k, _ in pairs]
+
+    def load(self, key):
+        return self._data[str(key)]
+
+    def load_many(self, keys):
+        data = self._data
+        return {key: data[str(key)] for key in keys if str(key) in data}
+
+
+# ============================================================
+# 3. SEGMENTEDLOGSTORAGE
+# ============================================================
+#
+# Record layout (little endian):
+#   key_len: u16 | value_len: u32 | crc32: u32 | key | value
+#
+# Writes only ever append. A newer record for the same key simply
+# shadows the older one in the index. When the active segment grows
+# past `segment_size`, a new segment file is started. On open, the
+# index is rebuilt by scanning the segments in order; a torn record at
+# the end of the last segment (crash mid-write) is truncated away. Older
+# segments are sealed: a bad record there is corruption, not a torn
+# write, so opening fails (ValueError) and the file is left untouched.
+
+_RECORD = struct.Struct("<HII")
+
+
+class SegmentedLogStorage(KeyedStorage):
+    def __init__(self, directory, segment_size=64 << 20, fsync=False):
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.fsync = fsync
+        self._index = {}        # key -> (segment_no, value_offset, value_len)
+        self._readers = {}      # segment_no -> read fd
+        self._recover()
+
+    # -------- files --------
+
+    def _segment_path(self, number):
+        return self.directory / f"segment-{number:06d}.log"
+
+    def _segments(self):
+        return sorted(int(p.stem.split("-")[1]) for p in self.directory.glob("segment-*.log"))
+
+    def _recover(self):
+        numbers = self._segments() or [1]
+        for number in numbers:
+            path = self._segment_path(number)
+            if path.exists():
+                valid = self._scan(number, path.read_bytes())
+                if valid == path.stat().st_size:
+                    continue
+                if number != numbers[-1]:
+                    raise ValueError(f"{path}: corrupt record at byte {valid} in a sealed segment")
+                os.truncate(path, valid)
+        self._resume_ids(self._index)
+        self._active_no = numbers[-1]
+        self._writer = open(self._segment_path(self._active_no), "ab", buffering=1 << 20)
+        self._active_size = self._writer.tell()
+
+    def _scan(self, number, blob):
+        offset = 0
+        while offset + _RECORD.size <= len(blob):
+            key_len, value_len, crc = _RECORD.unpack_from(blob, offset)
+            start = offset + _RECORD.size
+            end = start + key_len + value_len
+            if end > len(blob) or zlib.crc32(blob[start:end]) != crc:
+                break
+            key = blob[start:start + key_len].decode("utf-8")
+            self._index[key] = (number, start + key_len, value_len)
+            offset = end
+        return offset
+
+    def _roll(self):
+        self._writer.close()
+        self._active_no += 1
+        self._writer = open(self._segment_path(self._active_no), "ab", buffering=1 << 20)
+        self._active_size = 0
+
+    # -------- writes --------
+
+    def _append(self, key, value):
+        key_bytes, value_bytes = key.encode("utf-8"), encode(value)
+        body = key_bytes + value_bytes
+        self._writer.write(_RECORD.pack(len(key_bytes), len(value_bytes), zlib.crc32(body)))
+        self._writer.write(body)
+        value_offset = self._active_size + _RECORD.size + len(key_bytes)
+        self._index[key] = (self._active_no, value_offset, len(value_bytes))
+        self._active_size += _RECORD.size + len(body)
+        if self._active_size >= self.segment_size:
+            self._commit()
+            self._roll()
+
+    def _commit(self):
+        self._writer.flush()
+        if self.fsync:
+            os.fsync(self._writer.fileno())
+
+    def save(self, data, key=None):
+        key = self._key(key)
+        self._append(key, data)
+        self._commit()
+        return key
+
+    def save_many(self, records, keyed=False):
+        pairs = self._pairs(records, keyed)
+        for key, value in pairs:
+            self._append(key, value)
+        self._commit()                # one flush (and fsync) for the batch
+        return [k for k, _ in pairs]
+
+    # -------- reads --------
+
+    def load(self, key):
+        number, offset, length = self._index[str(key)]
+        fd = self._readers.get(number)
+        if fd is None:
+            fd = self._readers[number] = os.open(self._segment_path(number), os.O_RDONLY)
+        return decode(os.pread(fd, length, offset))
+
+    def disk_usage(self):
+        return sum(self._segment_path(n).stat().st_size for n in self._segments())
+
+    def close(self):
+        self._commit()
+        self._writer.close()
+        for fd in self._readers.values():
+            os.close(fd)
+        self._readers.clear()
+
+
+# ============================================================
+# 4. SQLITESTORAGE
+# ============================================================
+#
+# WAL mode lets readers run while a writer appends, and turns each
+# commit into a sequential append to the -wal file. synchronous=NORMAL
+# fsyncs at checkpoints instead of every commit. The big win, though,
+# is batching: save_many() is ONE transaction for the whole list.
+#
+# The connection may be used from any thread (a write-behind flusher,
+# for one); a lock keeps its calls, and each transaction, serialized.
+
+class SQLiteStorage(KeyedStorage):
+    def __init__(self, path, synchronous="NORMAL"):
+        super().__init__()
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={synchronous}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._resume_ids(k for (k,) in self._db.execute("SELECT key FROM records WHERE key LIKE 'auto-%'"))
+
+    def save(self, data, key=None):
+        key = self._key(key)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO records (key, value) VALUES (?, ?)", (key, encode(data))
+            )
+        return key
+
+    def save_many(self, records, keyed=False):
+        pairs = self._pairs(records, keyed)
+        with self._lock, self._db:          # one BEGIN … COMMIT
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO records (key, value) VALUES (?, ?)",
+                ((k, encode(v)) for k, v in pairs),
+            )
+        return [k for k, _ in pairs]
+
+    def load(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM records WHERE key = ?", (str(key),)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return decode(row[0])
+
+    def load_many(self, keys):
+        # One query per chunk instead of one per key (SQLite caps the
+        # number of "?" parameters, hence the chunks).
+        wanted = {str(k): k for k in keys}
+        names = list(wanted)
+        found = {}
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT key, value FROM records WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+            for key, raw in rows:
+                found[wanted[key]] = decode(raw)
+        return found
+
+    def disk_usage(self):
+        return sum(
+            p.stat().st_size
+            for p in (self.path, Path(f"{self.path}-wal"), Path(f"{self.path}-shm"))
+            if p.exists()
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ============================================================
+# 5. BENCHMARK HARNESS
+# ============================================================
+
+def benchmark_storage(storage, n=20_000, batch_size=1_000, reads=2_000):
+    """Return writes/s (single and bulk), read latency and disk size."""
+    record = {"user": "alex", "event": "login", "payload": "x" * 64}
+
+    single_n = n // 10
+    start = time.perf_counter()
+    for i in range(single_n):
+        save_data(storage, record)         # the original GRASP entry point
+    single_rate = single_n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    keys = []
+    for i in range(0, n, batch_size):
+        keys.extend(storage.save_many([record] * min(batch_size, n - i)))
+    bulk_rate = n / (time.perf_counter() - start)
+
+    latencies = []
+    for key in random.sample(keys, min(reads, len(keys))):
+        start = time.perf_counter()
+        storage.load(key)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    return {
+        "save/s": single_rate,
+        "save_many/s": bulk_rate,
+        "read_p50_us": latencies[len(latencies) // 2] * 1e6,
+        "read_p99_us": latencies[int(0.99 * (len(latencies) - 1))] * 1e6,
+        "disk_bytes": storage.disk_usage(),
+    }
+
+
+def main():
+    print("\n# -----------------------------")
+    print("# Storage backends benchmark")
+    print("# -----------------------------\n")
+
+    with tempfile.TemporaryDirectory(prefix="storage_") as tmp:
+        backends = [
+            ("InMemoryStorage", InMemoryStorage()),
+            ("SegmentedLogStorage", SegmentedLogStorage(Path(tmp) / "log", segment_size=1 << 20)),
+            ("SQLiteStorage", SQLiteStorage(Path(tmp) / "store.db")),
+        ]
+        print(f"{'backend':22} {'save/s':>10} {'save_many/s':>12} {'read p50':>10} {'read p99':>10} {'disk':>10}")
+        for name, storage in backends:
+            with storage:
+                r = benchmark_storage(storage)
+            print(
+                f"{name:22} {r['save/s']:10,.0f} {r['save_many/s']:12,.0f} "
+                f"{r['read_p50_us']:8.1f}us {r['read_p99_us']:8.1f}us {r['disk_bytes'] / 1024:8.0f}KB"
+            )
+
+        # Reopening the log rebuilds its index from the segments.
+        reopened = SegmentedLogStorage(Path(tmp) / "log")
+        print("\nSegments on disk:", len(reopened._segments()),
+              "| reopened log still has auto-1:", reopened.load("auto-1")["event"],
+              "| next generated key:", reopened.save({"event": "reopen"}))
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# ============================================================
+#     OOP AT SCALE — VECTORIZED total_area FOR SHAPE COLLECTIONS
+# ============================================================
+#
+# Description:
+#   total_area() in solid_principles.py (and the polymorphic loop in
+#   oop_basics_lesson3.py) calls shape.area() once per object. With
+#   millions of shapes the cost is method dispatch, not arithmetic.
+#
+#   ShapeCollection keeps the Open–Closed promise but changes storage:
+#     - shapes are grouped by their EXACT concrete type
+#     - each group keeps its dimensions in typed arrays (array("d"))
+#     - a registered kernel computes a whole group in one NumPy pass
+#     - any other Shape subclass still works via a per-object fallback
+#
+#   NumPy is optional: without it the kernels run over the same typed
+#   arrays in pure Python (slower, but still no per-object dispatch).
+#
+# Contents:
+#   1. Optional NumPy import
+#   2. Kernel registry (one formula per concrete class)
+#   3. ShapeCollection
+#   4. Demo and benchmark
+#
+# ============================================================
+
+import time
+from array import array
+
+from solid_principles import Circle, Rectangle, Shape, total_area
+
+
+# ============================================================
+# 1. OPTIONAL NUMPY IMPORT
+# ============================================================
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+# ============================================================
+# 2. KERNEL REGISTRY
+# ============================================================
+#
+# A kernel receives one sequence per field and returns the SUM of the
+# areas of the group. Its formula must match the class's area():
+# solid_principles.Circle uses 3.14, not math.pi.
+#
+# Lookup is by exact type on purpose (see builtins/is_operator.py,
+# section 5): a subclass may override area(), so it must not silently
+# reuse its parent's formula.
+
+_KERNELS = {}
+
+
+def register_kernel(cls, fields, numpy_kernel, python_kernel):
+    _KERNELS[cls] = (tuple(fields), numpy_kernel, python_kernel)
+
+
+register_kernel(
+    Circle,
+    ("radius",),
+    lambda r: float((3.14 * r * r).sum()),
+    lambda r: sum(3.14 * x * x for x in r),
+)
+register_kernel(
+    Rectangle,
+    ("width", "height"),
+    lambda w, h: float(np.dot(w, h)),
+    lambda w, h: sum(x * y for x, y in zip(w, h)),
+)
+
+
+# ============================================================
+# 3. SHAPECOLLECTION
+# ============================================================
+
+class ShapeCollection:
+    """Columnar storage for shapes with vectorized area totals."""
+
+    def __init__(self, shapes=()):
+        self._columns = {}   # cls -> tuple of array("d"), one per field
+        self._fallback = []  # shapes without a kernel
+        for shape in shapes:
+            self.add(shape)
+
+    def add(self, shape):
+        if not isinstance(shape, Shape):
+            raise TypeError("Only Shape instances are allowed")
+        cls = type(shape)
+        kernel = _KERNELS.get(cls)
+        if kernel is None:
+            self._fallback.append(shape)
+            return
+        fields = kernel[0]
+        columns = self._columns.get(cls)
+        if columns is None:
+            columns = self._columns[cls] = tuple(array("d") for _ in fields)
+        for column, field in zip(columns, fields):
+            column.append(getattr(shape, field))
+
+    def __len__(self):
+        return sum(len(cols[0]) for cols in self._columns.values()) + len(self._fallback)
+
+    def group_sizes(self):
+        sizes = {cls.__name__: len(cols[0]) for cls, cols in self._columns.items()}
+        sizes["fallback"] = len(self._fallback)
+        return sizes
+
+    def total_area(self):
+        total = 0.0
+        for cls, columns in self._columns.items():
+            _, numpy_kernel, python_kernel = _KERNELS[cls]
+            if np is not None:
+                # frombuffer shares memory with the array("d"): no copy.
+                total += numpy_kernel(*(np.frombuffer(col, dtype=np.float64) for col in columns))
+            else:
+                total += python_kernel(*columns)
+        total += sum(shape.area() for shape in self._fallback)
+        return total
+
+
+# ============================================================
+# 4. DEMO AND BENCHMARK
+# ============================================================
+
+class Triangle(Shape):
+    # No kernel registered → handled by the per-object fallback.
+    def __init__(self, base, height):
+        self.base = base
+        self.height = height
+
+    def area(self):
+        return 0.5 * self.base * self.height
+
+
+def demo():
+    print("\n# -----------------------------")
+    print("# ShapeCollection demo")
+    print("# -----------------------------\n")
+
+    shapes = [Circle(3), Rectangle(4, 5), Triangle(6, 2), Rectangle(2, 9)]
+    collection = ShapeCollection(shapes)
+    print("Groups:", collection.group_sizes())
+    print("total_area(list):            ", total_area(shapes))
+    print("ShapeCollection.total_area():", collection.total_area())
+    print("NumPy available:", np is not None)
+
+
+def benchmark(n=1_000_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {n:,} shapes")
+    print("# -----------------------------\n")
+
+    shapes = [
+        Circle(i % 7 + 1) if i % 2 else Rectangle(i % 5 + 1, i % 3 + 1)
+        for i in range(n)
+    ]
+    shapes.extend(Triangle(2, 3) for _ in range(n // 100))
+
+    start = time.perf_counter()
+    expected = total_area(shapes)
+    loop_time = time.perf_counter() - start
+
+    collection = ShapeCollection(shapes)
+    start = time.perf_counter()
+    result = collection.total_area()
+    vector_time = time.perf_counter() - start
+
+    print(f"total_area() per object : {loop_time * 1000:9.1f} ms  → {expected:,.2f}")
+    print(f"ShapeCollection         : {vector_time * 1000:9.1f} ms  → {result:,.2f}")
+    print(f"Backend                 : {'NumPy' if np is not None else 'pure Python arrays'}")
+    print(f"Same result (rel 1e-9)  : {abs(result - expected) <= 1e-9 * abs(expected)}")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
@@ -0,0 +1,181 @@
+# ============================================================
+#     OOP AT SCALE — EXCEPTION-FREE WITHDRAWAL RESULTS
+# ============================================================
+#
+# Description:
+#   BankAccount.withdraw (error_handling_oop.py, section 2) raises
+#   NegativeAmountError / InsufficientFundsError. That is the right API
+#   for code where a rejection is exceptional. In a fraud simulation
+#   that rejects ~40% of withdrawals, rejection is ordinary control
+#   flow, and each one pays for building an exception, formatting its
+#   message and unwinding a traceback.
+#
+#   This file adds a result-returning path next to the raising one:
+#     - WithdrawStatus: OK / NOT_POSITIVE / INSUFFICIENT_FUNDS
+#     - try_withdraw(amount) → status, nothing raised
+#     - apply_withdrawals(amounts) → one status code per item, in one
+#       tight loop (codes in a bytearray, no objects per item)
+#     - withdraw(amount) still raises, with the same messages, and is
+#       now a thin wrapper over try_withdraw
+#
+#   The Ledger in bank_ledger.py gains the same try_/apply_ methods.
+#
+# Contents:
+#   1. WithdrawStatus
+#   2. StatusBankAccount
+#   3. Demo
+#   4. Benchmark across rejection rates
+#
+# ============================================================
+
+import random
+import time
+from enum import IntEnum
+
+from error_handling_oop import BankAccount, InsufficientFundsError, NegativeAmountError
+
+
+# ============================================================
+# 1. WITHDRAWSTATUS
+# ============================================================
+#
+# IntEnum so a status is also a small int: batch results are stored as
+# raw codes and turned back into members only when someone looks.
+
+class WithdrawStatus(IntEnum):
+    OK = 0
+    NOT_POSITIVE = 1
+    INSUFFICIENT_FUNDS = 2
+
+
+# Module-level aliases: WithdrawStatus.OK goes through the enum class's
+# attribute machinery on every access, a plain global does not.
+OK = WithdrawStatus.OK
+NOT_POSITIVE = WithdrawStatus.NOT_POSITIVE
+INSUFFICIENT_FUNDS = WithdrawStatus.INSUFFICIENT_FUNDS
+
+
+def statuses(codes):
+    """Decode the bytearray returned by apply_withdrawals()."""
+    return [WithdrawStatus(code) for code in codes]
+
+
+def status_counts(codes):
+    return {status.name: codes.count(status) for status in WithdrawStatus}
+
+
+# ============================================================
+# 2. STATUSBANKACCOUNT
+# ============================================================
+
+class StatusBankAccount(BankAccount):
+    def try_withdraw(self, amount):
+        if amount <= 0:
+            return NOT_POSITIVE
+        if amount > self.balance:
+            return INSUFFICIENT_FUNDS
+        self.balance -= amount
+        return OK
+
+    def withdraw(self, amount):
+        status = self.try_withdraw(amount)
+        if status is NOT_POSITIVE:
+            raise NegativeAmountError("Withdrawal must be positive.")
+        if status is INSUFFICIENT_FUNDS:
+            raise InsufficientFundsError(
+                f"Not enough funds: tried {amount}, available {self.balance}"
+            )
+        return self.balance
+
+    def apply_withdrawals(self, amounts):
+        """Apply amounts in order; return a bytearray of WithdrawStatus codes.
+
+        Each outcome depends on the balance left by the ones before it,
+        so this is one pass with locals instead of a vector operation.
+        """
+        codes = bytearray(len(amounts))       # zero-filled: OK
+        not_positive, insufficient = int(NOT_POSITIVE), int(INSUFFICIENT_FUNDS)
+        balance = self.balance
+        for i, amount in enumerate(amounts):
+            if amount <= 0:
+                codes[i] = not_positive
+            elif amount > balance:
+                codes[i] = insufficient
+            else:
+                balance -= amount
+        self.balance = balance
+        return codes
+
+
+# ============================================================
+# 3. DEMO
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Raising and result-returning APIs side by side")
+    print("# -----------------------------\n")
+
+    alex = StatusBankAccount("Alex", 100)
+    try:
+        alex.withdraw(200)
+    except InsufficientFundsError as e:
+        print("withdraw(200)     → Error:", e)
+    print("try_withdraw(200) →", alex.try_withdraw(200).name)
+    print("try_withdraw(-5)  →", alex.try_withdraw(-5).name)
+    codes = alex.apply_withdrawals([30, -1, 500, 20, 60])
+    print("apply_withdrawals →", [s.name for s in statuses(codes)], "| balance", alex.balance)
+
+
+# ============================================================
+# 4. BENCHMARK ACROSS REJECTION RATES
+# ============================================================
+
+def _amounts(n, rejection_rate, rng):
+    # Half the rejections are non-positive, half overdraw the account.
+    amounts = []
+    for _ in range(n):
+        if rng.random() < rejection_rate:
+            amounts.append(-1 if rng.random() < 0.5 else 10**12)
+        else:
+            amounts.append(1)
+    return amounts
+
+
+def _with_exceptions(account, amounts):
+    for amount in amounts:
+        try:
+            account.withdraw(amount)
+        except (NegativeAmountError, InsufficientFundsError):
+            pass
+
+
+def _with_try(account, amounts):
+    for amount in amounts:
+        account.try_withdraw(amount)
+
+
+def benchmark(n=300_000, rates=(0.0, 0.1, 0.4, 0.8)):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {n:,} withdrawals, ns per withdrawal")
+    print("# -----------------------------\n")
+
+    rng = random.Random(5)
+    print(f"{'rejected':>9} | {'withdraw + except':>17} | {'try_withdraw':>12} | {'apply_withdrawals':>17}")
+    for rate in rates:
+        amounts = _amounts(n, rate, rng)
+        row = []
+        # The raising column uses the lesson's BankAccount, unchanged.
+        for cls, run in ((BankAccount, _with_exceptions),
+                         (StatusBankAccount, _with_try),
+                         (StatusBankAccount, StatusBankAccount.apply_withdrawals)):
+            account = cls("Sim", n * 2)
+            start = time.perf_counter()
+            run(account, amounts)
+            row.append((time.perf_counter() - start) / n * 1e9)
+        print(f"{rate:>9.0%} | {row[0]:>17.0f} | {row[1]:>12.0f} | {row[2]:>17.0f}")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
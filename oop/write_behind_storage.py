@@ -0,0 +1,317 @@
+# ============================================================
+#     OOP AT SCALE — WRITE-BEHIND BUFFERING FOR Storage.save
+# ============================================================
+#
+# Description:
+#   save_data(storage, data) (grasp_principles.py, section 9) calls the
+#   backend synchronously, so under bursty traffic the caller's latency
+#   IS the storage latency.
+#
+#   WriteBehindStorage is a decorator (wrapper) around ANY Storage:
+#     - save() acknowledges immediately (data is in memory)
+#     - repeated saves of the same key are coalesced: only the latest
+#       value is written
+#     - a background thread flushes in batches (save_many() when the
+#       backend has it, save() otherwise)
+#     - memory is bounded: when `max_pending` entries wait, save()
+#       blocks (backpressure) or raises after `put_timeout`
+#     - a failed batch is retried (only the records not yet written);
+#       after `max_retries` failed attempts a record is dropped and
+#       counted, so flush() and close() always finish
+#     - close() (also registered with atexit) flushes everything
+#     - metrics: queue depth, flush lag, batches, coalesced writes
+#
+# Contents:
+#   1. WriteBehindStorage
+#   2. Slow backend for the demo
+#   3. Demo and latency benchmark
+#
+# ============================================================
+
+import atexit
+import threading
+import time
+import weakref
+
+from grasp_principles import Storage, save_data
+from storage_backends import InMemoryStorage
+
+
+# ============================================================
+# 1. WRITEBEHINDSTORAGE
+# ============================================================
+
+class BackpressureTimeout(Exception):
+    """Raised when the write-behind buffer stays full for `put_timeout`."""
+
+
+class _Anonymous:
+    # Key placeholder for saves without a key: they are never coalesced.
+    __slots__ = ()
+
+
+class WriteBehindStorage(Storage):
+    """Acknowledge now, write later, in batches, from one background thread."""
+
+    def __init__(self, inner, *, batch_size=500, flush_interval=0.05,
+                 max_pending=10_000, put_timeout=None, max_retries=3):
+        self.inner = inner
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+
+        self._pending = {}            # key -> (data, first_enqueued_at)
+        self._in_flight = {}          # batch currently being written
+        self._attempts = {}           # key -> failed write attempts so far
+        self.last_error = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+        self.metrics = {
+            "acknowledged": 0,
+            "coalesced": 0,
+            "written": 0,
+            "batches": 0,
+            "errors": 0,
+            "dropped": 0,
+            "max_depth": 0,
+            "last_flush_lag_s": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        # Durable shutdown: flush whatever is left when the interpreter exits.
+        atexit.register(_close_if_alive, weakref.ref(self))
+
+    # -------- producer side --------
+
+    def save(self, data, key=None):
+        slot = key if key is not None else _Anonymous()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WriteBehindStorage is closed")
+            if slot in self._pending:
+                _, since = self._pending[slot]
+                self._pending[slot] = (data, since)
+                self.metrics["coalesced"] += 1
+            else:
+                self._wait_for_room()
+                self._pending[slot] = (data, time.monotonic())
+            self.metrics["acknowledged"] += 1
+            depth = len(self._pending)
+            self.metrics["max_depth"] = max(self.metrics["max_depth"], depth)
+            if depth >= self.batch_size:
+                self._cond.notify_all()
+        return key
+
+    def _wait_for_room(self):
+        deadline = None if self.put_timeout is None else time.monotonic() + self.put_timeout
+        while len(self._pending) >= self.max_pending:
+            self._cond.notify_all()        # wake the flusher
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise BackpressureTimeout(f"{len(self._pending)} writes pending")
+            self._cond.wait(remaining)
+
+    def load(self, key):
+        # Read-your-writes: unflushed data wins over the backend.
+        with self._cond:
+            for buffer in (self._pending, self._in_flight):
+                if key in buffer:
+                    return buffer[key][0]
+        return self.inner.load(key)
+
+    # -------- flusher side --------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._flush_requested
+                    or len(self._pending) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                if not self._pending:
+                    self._flush_requested = False
+                    self._cond.notify_all()
+                    if self._closed:
+                        return
+                    continue
+                self._in_flight = self._pending
+                self._pending = {}
+                self._cond.notify_all()     # producers blocked on backpressure
+
+            self._write(self._in_flight)
+
+            with self._cond:
+                self._in_flight = {}
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        oldest = min(since for _, since in batch.values())
+        items = list(batch.items())
+        written = set()               # slots the backend has accepted
+        try:
+            for start in range(0, len(items), self.batch_size):
+                self._write_chunk(items[start:start + self.batch_size], written)
+        except Exception as e:
+            self._requeue([(slot, value) for slot, value in items if slot not in written], e)
+            with self._cond:
+                self.metrics["written"] += len(written)
+                for slot in written:
+                    self._attempts.pop(slot, None)
+            time.sleep(self.flush_interval)
+            return
+        with self._cond:
+            self.metrics["written"] += len(items)
+            self.metrics["last_flush_lag_s"] = round(time.monotonic() - oldest, 4)
+            for slot in written:
+                self._attempts.pop(slot, None)
+
+    def _requeue(self, failed, error):
+        with self._cond:
+            self.metrics["errors"] += 1
+            self.last_error = repr(error)
+            for slot, value in failed:
+                attempts = self._attempts.get(slot, 0) + 1
+                if attempts > self.max_retries:
+                    # Give up on this record so flush()/close() can finish.
+                    self._attempts.pop(slot, None)
+                    self.metrics["dropped"] += 1
+                elif self._pending.setdefault(slot, value) is value:
+                    self._attempts[slot] = attempts
+                else:
+                    # A newer save for the key is already queued: it
+                    # replaces the failed value and starts fresh.
+                    self._attempts.pop(slot, None)
+
+    def _write_chunk(self, chunk, written):
+        save_many = getattr(self.inner, "save_many", None)
+        keyed = [(k, v[0]) for k, v in chunk if not isinstance(k, _Anonymous)]
+        anonymous = [(k, v[0]) for k, v in chunk if isinstance(k, _Anonymous)]
+        if save_many is not None:
+            if keyed:
+                save_many(keyed, keyed=True)
+                written.update(k for k, _ in keyed)
+            if anonymous:
+                save_many([data for _, data in anonymous])
+                written.update(k for k, _ in anonymous)
+        else:
+            for key, data in keyed:
+                self.inner.save(data, key)
+                written.add(key)
+            for slot, data in anonymous:
+                self.inner.save(data)
+                written.add(slot)
+        with self._cond:
+            self.metrics["batches"] += 1
+
+    # -------- control --------
+
+    def flush(self):
+        """Block until everything acknowledged so far is in the backend.
+
+        Failed records are retried up to `max_retries` times, then
+        dropped (metrics["dropped"], last_error), so this always returns.
+        """
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._pending and not self._in_flight)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if hasattr(self.inner, "close"):
+            self.inner.close()
+
+    def stats(self):
+        with self._cond:
+            # A key can be in flight AND pending again: count it once.
+            pending = {**self._in_flight, **self._pending}
+            oldest = [since for _, since in self._in_flight.values()]
+            oldest += [since for _, since in self._pending.values()]
+            lag = time.monotonic() - min(oldest) if oldest else 0.0
+            return {**self.metrics, "queue_depth": len(pending), "flush_lag_s": round(lag, 4)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _close_if_alive(ref):
+    storage = ref()
+    if storage is not None:
+        storage.close()
+
+
+# ============================================================
+# 2. SLOW BACKEND FOR THE DEMO
+# ============================================================
+
+class SlowStorage(InMemoryStorage):
+    """Each call costs `call_latency` (a network round trip)."""
+
+    def __init__(self, call_latency=0.002):
+        super().__init__()
+        self.call_latency = call_latency
+        self.calls = 0
+
+    def save(self, data, key=None):
+        time.sleep(self.call_latency)
+        self.calls += 1
+        return super().save(data, key)
+
+    def save_many(self, records, keyed=False):
+        time.sleep(self.call_latency)
+        self.calls += 1
+        return super().save_many(records, keyed)
+
+
+# ============================================================
+# 3. DEMO AND LATENCY BENCHMARK
+# ============================================================
+
+def burst(storage, n, hot_keys=100):
+    latencies = []
+    for i in range(n):
+        start = time.perf_counter()
+        storage.save({"counter": i}, key=f"user-{i % hot_keys}")
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def main(n=2_000):
+    print("\n# -----------------------------")
+    print(f"# Burst of {n:,} saves over 100 hot keys, 2 ms backend")
+    print("# -----------------------------\n")
+
+    direct = SlowStorage()
+    start = time.perf_counter()
+    p50, p99 = burst(direct, n)
+    print(f"direct       : p50 {p50 * 1e6:8.1f} us | p99 {p99 * 1e6:8.1f} us"
+          f" | total {time.perf_counter() - start:.2f}s | backend calls {direct.calls}")
+
+    backend = SlowStorage()
+    with WriteBehindStorage(backend, max_pending=1_000) as buffered:
+        start = time.perf_counter()
+        p50, p99 = burst(buffered, n)
+        print(f"write-behind : p50 {p50 * 1e6:8.1f} us | p99 {p99 * 1e6:8.1f} us"
+              f" | total {time.perf_counter() - start:.2f}s | stats {buffered.stats()}")
+        save_data(buffered, "keyless record")          # original entry point
+        buffered.flush()
+        print("after flush  :", buffered.stats())
+        print("latest user-7:", buffered.load("user-7"), "| backend calls:", backend.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# ============================================================
+#      RING BUFFER — ROLLING METRICS WITHOUT TAIL SLICES
+# ============================================================
+#
+# Description:
+#   negative_indices.py (section 4) uses seq[-3:] for "the last three".
+#   Rolling-metric loops do the same on every new value:
+#
+#       history.append(x)
+#       tail = history[-n:]                  # copies n references
+#       mean, low, high = sum(tail) / n, min(tail), max(tail)
+#
+#   That is O(n) per step, three times over, and history keeps growing.
+#
+#   RingBuffer keeps the last `capacity` values in a typed array:
+#     - append is O(1): it overwrites the oldest slot
+#     - buf[-1] is the newest value, buf[0] the oldest, like a list
+#       holding only the tail
+#
+#   RollingWindow adds O(1) aggregates over that window:
+#     - sum and mean: add the new value, subtract the evicted one
+#       (float sums are recomputed once per `capacity` appends so
+#       rounding errors cannot pile up; still amortized O(1))
+#     - min and max: monotonic deques. The min deque holds (position,
+#       value) pairs with increasing values; a new value first drops
+#       every larger value from the back (they can never be the minimum
+#       again), expired positions leave from the front, and the front
+#       is the minimum. Each value enters and leaves once: amortized O(1).
+#
+#   The per-value cost is flat; for a window of ~10 the C-level slice
+#   and builtins are still faster, from ~100 on the window wins.
+#
+# Contents:
+#   1. RingBuffer
+#   2. RollingWindow
+#   3. Demo
+#   4. Streaming benchmark against slice-and-recompute
+#
+# ============================================================
+
+import math
+import random
+import time
+from array import array
+from collections import deque
+
+
+# ============================================================
+# 1. RINGBUFFER
+# ============================================================
+
+class RingBuffer:
+    def __init__(self, capacity, typecode="d"):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.typecode = typecode
+        self._items = array(typecode, bytes(capacity * array(typecode).itemsize))
+        self._next = 0                   # slot the next append writes
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def is_full(self):
+        return self._size == self.capacity
+
+    def append(self, value):
+        """Add value; return the value it pushed out, or None."""
+        items, slot = self._items, self._next
+        evicted = items[slot] if self._size == self.capacity else None
+        items[slot] = value
+        self._next = slot + 1 if slot + 1 < self.capacity else 0
+        if evicted is None:
+            self._size += 1
+        return evicted
+
+    def _slot(self, idx):
+        size = self._size
+        if idx < 0:
+            idx += size
+        if not 0 <= idx < size:
+            raise IndexError("RingBuffer index out of range")
+        # The oldest value sits at _next once the buffer has wrapped.
+        return (self._next - size + idx) % self.capacity
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return array(self.typecode, (self._items[self._slot(i)] for i in range(*idx.indices(self._size))))
+        return self._items[self._slot(idx)]
+
+    def __iter__(self):
+        items, start = self._items, self._next - self._size
+        if start >= 0:
+            return iter(items[start:self._next])
+        return iter(items[start:] + items[:self._next])     # wrapped: two pieces
+
+    def clear(self):
+        self._next = self._size = 0
+
+    def __repr__(self):
+        return f"RingBuffer({list(self)}, capacity={self.capacity})"
+
+
+# ============================================================
+# 2. ROLLINGWINDOW
+# ============================================================
+
+class RollingWindow:
+    def __init__(self, size, typecode="d"):
+        self.buffer = RingBuffer(size, typecode)
+        self._exact = typecode not in ("f", "d")    # integer sums never drift
+        self._sum = 0
+        self._count = 0                  # values ever appended: their positions
+        self._mins = deque()             # (position, value), values increasing
+        self._maxs = deque()             # (position, value), values decreasing
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def append(self, value):
+        buffer = self.buffer
+        evicted = buffer.append(value)
+        if not self._exact:
+            # Aggregate what was stored: "f" rounds to float32, and "d"
+            # turns ints into floats. _next - 1 is -1 right after a wrap,
+            # which is the last slot: exactly where the value went.
+            value = buffer._items[buffer._next - 1]
+        position = self._count = self._count + 1
+        if evicted is not None:
+            self._sum -= evicted
+        self._sum += value
+        if not self._exact and position % buffer.capacity == 0:
+            self._sum = math.fsum(buffer)
+
+        oldest = position - buffer.capacity      # positions <= oldest left the window
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((position, value))
+        if mins[0][0] <= oldest:
+            mins.popleft()
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((position, value))
+        if maxs[0][0] <= oldest:
+            maxs.popleft()
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def clear(self):
+        """Empty the window; unlike buffer.clear(), also resets sum, min and max."""
+        self.buffer.clear()
+        self._sum = 0
+        self._count = 0
+        self._mins.clear()
+        self._maxs.clear()
+
+    def _require(self):
+        if not len(self.buffer):
+            raise ValueError("rolling window is empty")
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def mean(self):
+        self._require()
+        return self._sum / len(self.buffer)
+
+    @property
+    def min(self):
+        self._require()
+        return self._mins[0][1]
+
+    @property
+    def max(self):
+        self._require()
+        return self._maxs[0][1]
+
+    def __getitem__(self, idx):
+        return self.buffer[idx]
+
+    def __repr__(self):
+        if not len(self):
+            return f"RollingWindow(size={self.buffer.capacity}, empty)"
+        return (f"RollingWindow(size={self.buffer.capacity}, n={len(self)}, sum={self.sum},"
+                f" mean={self.mean:.2f}, min={self.min}, max={self.max})")
+
+
+# ============================================================
+# 3. DEMO
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Negative indexing on a ring buffer")
+    print("# -----------------------------\n")
+
+    buf = RingBuffer(3, "i")
+    for value in (10, 20, 30, 40, 50):
+        evicted = buf.append(value)
+        print(f"append({value}) → evicted {evicted} | {list(buf)}")
+    print("buf[-1] =", buf[-1], "| buf[-3] =", buf[-3], "| buf[-2:] =", list(buf[-2:]))
+    try:
+        buf[-4]
+    except IndexError as e:
+        print("Error:", e)
+
+    print("\n# -----------------------------")
+    print("# Rolling sum / mean / min / max over the last 4")
+    print("# -----------------------------\n")
+
+    window = RollingWindow(4, "q")
+    for price in (5, 3, 8, 1, 9, 2, 7):
+        window.append(price)
+        print(f"{price}: {window}")
+
+
+# ============================================================
+# 4. STREAMING BENCHMARK AGAINST SLICE-AND-RECOMPUTE
+# ============================================================
+
+def _slice_and_recompute(stream, n):
+    history = []
+    for x in stream:
+        history.append(x)
+        tail = history[-n:]
+        mean, low, high = sum(tail) / len(tail), min(tail), max(tail)
+    return mean, low, high
+
+
+def _rolling(stream, n):
+    window = RollingWindow(n)
+    for x in stream:
+        window.append(x)
+        mean, low, high = window.mean, window.min, window.max
+    return mean, low, high
+
+
+def benchmark(values=50_000, sizes=(10, 100, 1_000)):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: {values:,} streamed values, us per value")
+    print("# -----------------------------\n")
+
+    rng = random.Random(3)
+    stream = [rng.uniform(0, 100) for _ in range(values)]
+    print(f"{'window':>7} | {'slice + recompute':>17} | {'RollingWindow':>13}")
+    for n in sizes:
+        row = []
+        for run in (_slice_and_recompute, _rolling):
+            start = time.perf_counter()
+            result = run(stream, n)
+            row.append((time.perf_counter() - start) / values * 1e6)
+            if run is _slice_and_recompute:
+                expected = result
+            else:
+                assert math.isclose(result[0], expected[0]) and result[1:] == expected[1:]
+        print(f"{n:>7,} | {row[0]:>17.2f} | {row[1]:>13.2f}")
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()
@@ -0,0 +1,210 @@
+# ============================================================
+#      SEQUENCE VIEWS — SLICES WITHOUT COPIES
+# ============================================================
+#
+# Description:
+#   negative_indices.py (section 8) ends with MySeq, which only accepts
+#   integer indexes: custom[1:] fails with TypeError ('<' between slice
+#   and int). And slicing the list it wraps COPIES: nums[a:b] allocates
+#   a new list of b - a references, every time.
+#
+#   Here MySeq becomes a view:
+#     - it stores the wrapped data plus a range() of positions in it
+#     - an int index (negative too) goes through that range
+#     - a slice, with any start/stop/step, returns a NEW VIEW whose range
+#       is range[slice]: Python computes it in O(1), clips it like list
+#       slicing, and it never touches the data
+#     - a view of a view keeps pointing at the original data: nested
+#       slices compose into one range, with no chain of wrappers
+#     - assignments write through to the data (lists, arrays,
+#       bytearrays, writable memoryviews)
+#     - buffer() hands out a real memoryview slice when the data
+#       supports the buffer protocol (array, bytearray, bytes,
+#       memoryview): zero-copy AND readable at C speed
+#
+#   A view is a fixed window: it does not follow a list that grows or
+#   shrinks later (positions past the new end raise IndexError).
+#
+#   Trade-off: each element read through a view of a list is one extra
+#   lookup, so ONE full scan of a list window is faster as a copy. Views
+#   win on memory, on windows that are created often but read only in
+#   part, and — through buffer() — on array/bytes data.
+#
+# Contents:
+#   1. MySeq as a view
+#   2. Demo
+#   3. Benchmark: view vs copy
+#
+# ============================================================
+
+import time
+import tracemalloc
+from array import array
+from collections.abc import Sequence
+
+
+# ============================================================
+# 1. MYSEQ AS A VIEW
+# ============================================================
+#
+# negative_indices.py prints as it runs, so importing it would replay
+# the lesson; MySeq is grown here instead.
+
+class MySeq(Sequence):
+    __slots__ = ("data", "positions")
+
+    def __init__(self, data, positions=None):
+        if isinstance(data, MySeq) and positions is None:   # re-wrap: keep the original data
+            data, positions = data.data, data.positions
+        self.data = data
+        self.positions = range(len(data)) if positions is None else positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return MySeq(self.data, self.positions[idx])   # O(1), no data touched
+        try:
+            return self.data[self.positions[idx]]          # range handles negatives
+        except IndexError:
+            raise IndexError("MySeq index out of range") from None
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            positions = self.positions[idx]
+            values = list(value)
+            if len(values) != len(positions):
+                raise ValueError(
+                    f"attempt to assign sequence of size {len(values)} to view of size {len(positions)}"
+                )
+            for i, v in zip(positions, values):
+                self.data[i] = v
+            return
+        try:
+            self.data[self.positions[idx]] = value
+        except IndexError:
+            raise IndexError("MySeq assignment index out of range") from None
+
+    def __iter__(self):
+        return map(self.data.__getitem__, self.positions)
+
+    def __reversed__(self):
+        return map(self.data.__getitem__, reversed(self.positions))
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None                                  # a view of mutable data
+
+    # -------- leaving the view --------
+
+    def _as_slice(self):
+        r = self.positions
+        stop = r.stop if r.stop >= 0 else None      # -1 would mean "the end"
+        return slice(r.start, stop, r.step)
+
+    def copy(self):
+        """Materialize: a slice of the data, in the data's own type."""
+        if not self.positions:
+            return self.data[0:0]
+        return self.data[self._as_slice()]
+
+    def buffer(self):
+        """Zero-copy memoryview of the window (buffer-protocol data only)."""
+        view = memoryview(self.data)
+        return view[self._as_slice()] if self.positions else view[0:0]
+
+    def __repr__(self):
+        preview = ", ".join(repr(v) for v in self[:6])
+        more = ", …" if len(self) > 6 else ""
+        r = self.positions
+        return f"MySeq([{preview}{more}], range({r.start}, {r.stop}, {r.step}) over {type(self.data).__name__})"
+
+
+# ============================================================
+# 2. DEMO
+# ============================================================
+
+def demo():
+    print("\n# -----------------------------")
+    print("# Same indexes as the lesson, plus slices")
+    print("# -----------------------------\n")
+
+    custom = MySeq(["x", "y", "z"])
+    print(custom[-1], custom[-2])                    # 'z' 'y'
+    letters = MySeq(["a", "b", "c", "d", "e"])
+    print(list(letters[-3:]), list(letters[:-2]), list(letters[-4:-1]), list(letters[::-1]))
+    try:
+        custom[-4]
+    except IndexError as e:
+        print("Error:", e)
+
+    print("\n# -----------------------------")
+    print("# Nested views compose, writes go through")
+    print("# -----------------------------\n")
+
+    nums = list(range(20))
+    window = MySeq(nums)[2:-2][::2][::-1]            # three slices, one range
+    print(window)
+    print("window.data is nums:", window.data is nums)
+    window[0] = -1                                   # writes nums[16]
+    print("nums[16] =", nums[16], "| copy():", window.copy())
+
+    print("\n# -----------------------------")
+    print("# A window over 100M bytes")
+    print("# -----------------------------\n")
+
+    big = bytearray(100_000_000)
+    tracemalloc.start()
+    tail = MySeq(memoryview(big))[-1_000_000:][::1000]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"view of {len(tail):,} items costs {used:,} bytes | buffer():", tail.buffer())
+    print("array data:", MySeq(array("d", [1.5, 2.5, 3.5, 4.5]))[1::2].copy())
+
+
+# ============================================================
+# 3. BENCHMARK: VIEW VS COPY
+# ============================================================
+
+def _timed(func):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark(n=10_000_000):
+    print("\n# -----------------------------")
+    print(f"# Benchmark: half-window of {n:,} elements")
+    print("# -----------------------------\n")
+
+    data = [1] * n
+    packed = array("q", data)
+    lo, hi = n // 4, 3 * n // 4
+
+    for label, make in (
+        ("list slice (copy)", lambda: data[lo:hi]),
+        ("MySeq(list) view", lambda: MySeq(data)[lo:hi]),
+        ("MySeq(array).buffer()", lambda: MySeq(packed)[lo:hi].buffer()),
+    ):
+        tracemalloc.start()
+        window = make()
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        create, window = _timed(make)
+        total, result = _timed(lambda window=window: sum(window))
+        assert result == hi - lo
+        print(f"{label:22}: create {create * 1e6:9.1f} us | {used / 1e6:6.1f} MB"
+              f" | sum() {total * 1e3:6.1f} ms")
+        del window
+
+
+if __name__ == "__main__":
+    demo()
+    benchmark()